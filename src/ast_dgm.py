@@ -41,41 +41,583 @@ DGM_MAP = {
     "PROOF": "cb",
     "FUNC_DEF": "cf",
     "FUNC_CALL": "cg",
-    "FIELD": "ch"
-    "RETURN": "ci"
+    "FIELD": "ch",
+    "RETURN": "ci",
     "INDEX": "cj",
-    "ASSIGN": "ck"
+    "ASSIGN": "ck",
     "BREAK": "cl",
-    "CONTINUE": "cm"
+    "CONTINUE": "cm",
     "SWITCH": "cn",
     "CASE": "co",
     "DEFAULT": "cp",
-    "FIELD_ASSIGN": "cq"
+    "FIELD_ASSIGN": "cq",
     "MATCH": "cr",
     "PATTERN": "cs",
     "METHOD_DEF": "ct",
-    "METHOD_CALL": "cu"
+    "METHOD_CALL": "cu",
     "TRAIT_DEF": "cv",
-    "TRAIT_IMPL": "cw"
+    "TRAIT_IMPL": "cw",
     "DESTRUCT": "cx",
-    "TRAIT_EXTENDS": "cy"
+    "TRAIT_EXTENDS": "cy",
     "GENERIC_TRAIT": "cz",
-    "GENERIC_IMPL": "caa"
+    "GENERIC_IMPL": "caa",
     "ENUM_DEF": "cba",
     "VARIANT": "cbb",
-    "GENERIC_HIGHER": "cbc"
+    "GENERIC_HIGHER": "cbc",
     "DO_BLOCK": "cbd",
     "FOR_BLOCK": "cbe",
     "MONAD_BIND": "cbf",
-    "MONAD_YIELD": "cbg"
+    "MONAD_YIELD": "cbg",
+    "EFFECT_BLOCK": "cbh",
+    "EFFECT_INVOKE": "cbi",
+    "HANDLER_DEF": "cbj",
+    "HANDLER_CASE": "cbk",
+    "ASYNC_BLOCK": "cbl",
+    "PARALLEL_BLOCK": "cbm",
+    "PARALLEL_FOR": "cbn"
    }
 
 class ASTNode:
+    # handler, cache and types are filled in by the optimization passes and VESE
+    __slots__ = ("tag", "value", "children", "handler", "cache", "types")
+
     def __init__(self, tag, value=None, children=None):
         self.tag = tag
         self.value = value
-        self.children = children or []
+        self.children = children if children is not None else ()
+
+    def __reduce__(self):
+        # constructor arguments pickle smaller than slot state; pass annotations only when set
+        extra = {k: getattr(self, k) for k in ("handler", "cache", "types") if hasattr(self, k)}
+        if extra:
+            return ASTNode, (self.tag, self.value, self.children), (None, extra)
+        return ASTNode, (self.tag, self.value, self.children)
 
     def __repr__(self):
         return f"ASTNode({self.tag}, {self.value}, {self.children})"
 
+
+# ast_dgm.py — dense integer tags
+
+from enum import IntEnum
+
+# names → base-12 dodecagram codes, plus codes for the tags the parser used to spell as strings
+DGM_CODES = dict(DGM_MAP, PARAMS="cbo", LIST_COMPREHENSION="cbp")
+TAG_CODES = list(DGM_CODES.values())   # indexed by tag id
+
+class DGMTag(IntEnum):
+    # a dense id that compares and hashes as a small int; prints as its code
+    @property
+    def code(self):
+        return TAG_CODES[self]
+
+    def __str__(self):
+        return str(TAG_CODES[self])
+
+    def __format__(self, spec):
+        return format(str(self), spec)
+
+Tag = DGMTag("Tag", [(name, i) for i, name in enumerate(DGM_CODES)])
+DGM_MAP = {name: Tag[name] for name in DGM_CODES}
+CODE_TAGS = {code: Tag[name] for name, code in DGM_CODES.items()}
+
+def tag_code(tag):
+    return tag.code if isinstance(tag, DGMTag) else tag
+
+def freeze(root):
+    # children lists become tuples once a tree is complete
+    stack = [root]
+    while stack:
+        n = stack.pop()
+        if not isinstance(n, ASTNode):
+            continue
+        if type(n.children) is not tuple:
+            n.children = tuple(n.children)
+        if isinstance(n.value, ASTNode):
+            stack.append(n.value)
+        stack.extend(n.children)
+    return root
+
+# ast_dgm.py — binary DGM format
+#
+# header | node records in preorder | marshal'd (tags, constants)
+#
+# Every record is 16 bytes: tag index, flags, value index, child count and
+# subtree size in records, so a reader can skip any subtree without decoding it.
+# Tags are stored by their DGM_MAP code; values and non-node children go
+# through one deduplicated constant table. Attributes set by later passes
+# (handler, cache, types) are not part of the format.
+
+import marshal, mmap, struct
+
+DGM_MAGIC = b"DGMB"
+DGM_VERSION = 1
+DGM_HEADER = struct.Struct("<4sHxxIII")   # magic, version, record count, constants offset, constants length
+DGM_RECORD = struct.Struct("<HBxIII")     # tag, flags, value, child count, subtree records
+VALUE_IS_NODE = 1    # the value is a node: it is the first record after this one
+CONST_LEAF = 0xFFFF  # tag of a record standing for a non-node child
+
+def const_key(value):
+    # typed all the way down: (1,), (1.0,) and (True,) are equal tuples but three constants
+    if isinstance(value, (tuple, list)):
+        return type(value), tuple(const_key(v) for v in value)
+    try:
+        hash(value)
+        return type(value), value
+    except TypeError:   # dicts and other unhashable leaves
+        return type(value), repr(value)
+
+def dumps(root):
+    """Serialize the tree under `root` in one preorder pass."""
+    out = bytearray(DGM_HEADER.size)
+    tags, tag_ids, consts, const_ids = [], {}, [], {}
+
+    def const(value):
+        key = const_key(value)
+        i = const_ids.get(key)
+        if i is None:
+            i = const_ids[key] = len(consts)
+            consts.append(value)
+        return i
+
+    count = 0
+    stack = [root]   # nodes to write, or ("end", record, first) markers
+    while stack:
+        n = stack.pop()
+        if type(n) is tuple and n and n[0] is DGM_RECORD:
+            # subtree finished: patch its size now that it is known
+            _, at, first = n
+            struct.pack_into("<I", out, at + 12, count - first)
+            continue
+        at = len(out)
+        if not isinstance(n, ASTNode):
+            out += DGM_RECORD.pack(CONST_LEAF, 0, const(n), 0, 1)
+            count += 1
+            continue
+        tag_id = tag_ids.get(n.tag)
+        if tag_id is None:
+            tag_id = tag_ids[n.tag] = len(tags)
+            tags.append(tag_code(n.tag))
+        node_value = isinstance(n.value, ASTNode)
+        value = 0 if node_value else const(n.value)
+        out += DGM_RECORD.pack(tag_id, VALUE_IS_NODE if node_value else 0, value, len(n.children), 0)
+        stack.append((DGM_RECORD, at, count))
+        count += 1
+        stack.extend(reversed(n.children))
+        if node_value:
+            stack.append(n.value)
+    table = marshal.dumps((tuple(tags), tuple(consts)))
+    DGM_HEADER.pack_into(out, 0, DGM_MAGIC, DGM_VERSION, count, len(out), len(table))
+    out += table
+    return bytes(out)
+
+def read_header(data):
+    magic, version, count, at, size = DGM_HEADER.unpack_from(data, 0)
+    if magic != DGM_MAGIC or version != DGM_VERSION:
+        raise ValueError("not a DGM binary AST (or an unsupported version)")
+    codes, consts = marshal.loads(data[at:at + size])
+    return count, tuple(CODE_TAGS.get(c, c) for c in codes), consts
+
+def loads(data):
+    """Rebuild the whole tree from dumps() output in one pass."""
+    count, tags, consts = read_header(data)
+    view = memoryview(data)[DGM_HEADER.size:DGM_HEADER.size + count * DGM_RECORD.size]
+    root = None
+    stack = []   # [node, children still expected, value still expected]
+    for tag, flags, value, nchildren, _ in DGM_RECORD.iter_unpack(view):
+        if tag == CONST_LEAF:
+            n = consts[value]
+        else:
+            n = ASTNode(tags[tag], None if flags & VALUE_IS_NODE else consts[value], [] if nchildren else ())
+        if not stack:
+            root = n
+        else:
+            top = stack[-1]
+            if top[2]:
+                top[0].value = n   # a node value is written before the children
+                top[2] = False
+            else:
+                top[0].children.append(n)
+                top[1] -= 1
+            while stack and not stack[-1][1] and not stack[-1][2]:
+                done = stack.pop()[0]
+                done.children = tuple(done.children)
+        if tag != CONST_LEAF and (nchildren or flags & VALUE_IS_NODE):
+            stack.append([n, nchildren, flags & VALUE_IS_NODE])
+    return root
+
+class DGMImage:
+    # records read in place from a buffer (bytes or mmap); nodes are made on demand
+    def __init__(self, data):
+        self.data = data
+        self.count, self.tags, self.consts = read_header(data)
+
+    def record(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError("DGM record out of range")
+        return DGM_RECORD.unpack_from(self.data, DGM_HEADER.size + i * DGM_RECORD.size)
+
+    def node(self, i):
+        tag, _, value, _, _ = self.record(i)
+        return self.consts[value] if tag == CONST_LEAF else LazyNode(self, i)
+
+    def root(self):
+        return self.node(0)
+
+    def fill(self, node):
+        # decode one record; its value and children stay lazy
+        tag, flags, value, nchildren, _ = self.record(node.index)
+        node.tag = self.tags[tag]
+        j = node.index + 1
+        if flags & VALUE_IS_NODE:
+            node.value = self.node(j)
+            j += self.record(j)[4]
+        else:
+            node.value = self.consts[value]
+        children = []
+        for _ in range(nchildren):
+            children.append(self.node(j))
+            j += self.record(j)[4]
+        node.children = tuple(children)
+
+class LazyNode(ASTNode):
+    # tag, value and children are plain attributes once decoded, so the node can
+    # be read and rewritten like any other ASTNode
+    __slots__ = ("image", "index")
+
+    def __init__(self, image, index):
+        self.image = image
+        self.index = index
+
+    def __getattr__(self, name):
+        if name in ("tag", "value", "children"):
+            self.image.fill(self)
+            return object.__getattribute__(self, name)
+        raise AttributeError(name)
+
+def dump(root, path):
+    with open(path, "wb") as f:
+        f.write(dumps(root))
+
+def load(path, lazy=True):
+    """Read a dump()ed tree; lazily through an mmap of the file unless lazy=False."""
+    with open(path, "rb") as f:
+        if not lazy:
+            return loads(f.read())
+        return DGMImage(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).root()
+
+# ast_dgm.py — arena trees
+#
+# A whole tree in four parallel arrays indexed by node id (a plain int, preorder
+# from 0): tag id, value, first child and next sibling (-1 for none). Values
+# index the constant table; a node-valued value is stored as ~id of that node,
+# which is not one of the children. Non-node children are ARENA_CONST records.
+# optimize() may splice pass output into a statement list: `spliced` maps a
+# parent id to its full list of child handles (ids and ASTNodes), which kids()
+# and to_tree() follow; children(), preorder() and find() read the arrays only.
+
+from array import array
+
+ARENA_CONST = 0xFF
+TAGS = list(Tag)   # indexed by tag id
+
+class Arena:
+    __slots__ = ("tags", "values", "first", "next", "consts", "const_ids", "spliced")
+
+    def __init__(self):
+        self.tags = array("B")
+        self.values = array("i")
+        self.first = array("i")
+        self.next = array("i")
+        self.consts = []
+        self.const_ids = {}
+        self.spliced = {}
+
+    def __len__(self):
+        return len(self.tags)
+
+    def const(self, value):
+        key = const_key(value)
+        i = self.const_ids.get(key)
+        if i is None:
+            i = self.const_ids[key] = len(self.consts)
+            self.consts.append(value)
+        return i
+
+    # ---------------------------------------------------
+    # building
+    # ---------------------------------------------------
+
+    def add(self, tag, value=None, parent=-1):
+        # one node (value is a constant), appended as the last child of `parent`
+        i = len(self.tags)
+        self.tags.append(tag)
+        self.values.append(self.const(value))
+        self.first.append(-1)
+        self.next.append(-1)
+        if parent >= 0:
+            j = self.first[parent]
+            if j < 0:
+                self.first[parent] = i
+            else:
+                while self.next[j] >= 0:
+                    j = self.next[j]
+                self.next[j] = i
+        return i
+
+    @classmethod
+    def from_tree(cls, root):
+        arena = cls()
+        tags, values, first, next_ = arena.tags, arena.values, arena.first, arena.next
+        const = arena.const
+        stack = [(root, -1, False)]   # (node, parent id, is the parent's value)
+        last = {}                     # parent id → id of its latest child
+        while stack:
+            n, parent, is_value = stack.pop()
+            i = len(tags)
+            if isinstance(n, ASTNode):
+                node_value = isinstance(n.value, ASTNode)
+                tags.append(n.tag)
+                values.append(~(i + 1) if node_value else const(n.value))
+                stack.extend((c, i, False) for c in reversed(n.children))
+                if node_value:
+                    stack.append((n.value, i, True))
+            else:
+                tags.append(ARENA_CONST)
+                values.append(const(n))
+            first.append(-1)
+            next_.append(-1)
+            if parent >= 0 and not is_value:
+                prev = last.get(parent)
+                if prev is None:
+                    first[parent] = i
+                else:
+                    next_[prev] = i
+                last[parent] = i
+        return arena
+
+    @classmethod
+    def from_dgm(cls, data):
+        arena = cls()
+        arena.append_dgm(data)
+        return arena
+
+    def append_dgm(self, data, parent=-1, skip_root=False):
+        """Append dumps() output without making nodes; with skip_root, the root's
+        children (and not the root itself) become the last children of `parent`."""
+        count, tags, consts = read_header(data)
+        records = memoryview(data)[DGM_HEADER.size:DGM_HEADER.size + count * DGM_RECORD.size]
+        raw = bytes(records)
+        words = records.cast("I")
+        lookup = bytearray(range(256))
+        for k, t in enumerate(tags):
+            lookup[k] = t
+        cmap = [self.const(c) for c in consts]
+
+        base = len(self.tags) - skip_root
+        skip = 1 if skip_root else 0
+        tag_ids = raw[skip * 16::16].translate(lookup)   # CONST_LEAF's low byte is ARENA_CONST
+        flags = raw[2::16]
+        nchildren, sizes = words[2::4], words[3::4]
+        values = array("i", map(cmap.__getitem__, words[1 + skip * 4::4]))
+        first, next_ = array("i", [-1]) * (count - skip), array("i", [-1]) * (count - skip)
+        ends = [count]
+        value_of = -1   # the record that is a node value has no siblings
+        for j in range(skip, count):
+            while ends[-1] <= j:
+                ends.pop()
+            end = j + sizes[j]
+            if end < ends[-1] and j != value_of:
+                next_[j - skip] = base + end
+            if nchildren[j] or flags[j] & VALUE_IS_NODE:
+                ends.append(end)
+            if flags[j] & VALUE_IS_NODE:
+                values[j - skip] = ~(base + j + 1)
+                value_of = j + 1
+                if nchildren[j]:
+                    first[j - skip] = base + j + 1 + sizes[j + 1]
+            elif nchildren[j]:
+                first[j - skip] = base + j + 1
+        if skip_root and parent >= 0 and count > 1:
+            head = base + 1 + (sizes[1] if flags[0] & VALUE_IS_NODE else 0)
+            j = self.first[parent]
+            if j < 0:
+                self.first[parent] = head
+            else:
+                while self.next[j] >= 0:
+                    j = self.next[j]
+                self.next[j] = head
+        self.tags.frombytes(tag_ids)
+        self.values.extend(values)
+        self.first.extend(first)
+        self.next.extend(next_)
+        return self
+
+    # ---------------------------------------------------
+    # traversal: ids only, no per-node objects
+    # ---------------------------------------------------
+
+    def children(self, i):
+        j, next_ = self.first[i], self.next
+        while j >= 0:
+            yield j
+            j = next_[j]
+
+    def value_node(self, i):
+        v = self.values[i]
+        return ~v if v < 0 else -1
+
+    def constant(self, i):
+        # value of a node (None when it is a node), or the constant of an ARENA_CONST record
+        v = self.values[i]
+        return self.consts[v] if v >= 0 else None
+
+    def preorder(self, i=0):
+        stack = [i]
+        first, next_, values = self.first, self.next, self.values
+        while stack:
+            i = stack.pop()
+            yield i
+            kids = []
+            j = first[i]
+            while j >= 0:
+                kids.append(j)
+                j = next_[j]
+            stack.extend(reversed(kids))
+            if values[i] < 0:
+                stack.append(~values[i])
+
+    def find(self, tag):
+        # ids of every node with this tag, by a scan of the tag bytes
+        data, i = self.tags.tobytes(), -1
+        while True:
+            i = data.find(tag, i + 1)
+            if i < 0:
+                return
+            yield i
+
+    def has(self, tag):
+        return tag in self.tags.tobytes()
+
+    # ---------------------------------------------------
+    # handle access (see TreeAccess): ids, or ASTNodes spliced in
+    # ---------------------------------------------------
+
+    def tag_of(self, h):
+        if type(h) is not int:
+            return TREE.tag_of(h)
+        t = self.tags[h]
+        return None if t == ARENA_CONST else t
+
+    def value_of(self, h):
+        if type(h) is not int:
+            return TREE.value_of(h)
+        v = self.values[h]
+        return self.consts[v] if v >= 0 else ~v
+
+    def kid(self, h, k):
+        if type(h) is not int or h in self.spliced:
+            return self.kids(h)[k]
+        j, next_ = self.first[h], self.next
+        while k and j >= 0:
+            j, k = next_[j], k - 1
+        if j < 0:
+            raise IndexError("child index out of range")
+        return j
+
+    def kids(self, h):
+        if type(h) is not int:
+            return h.children
+        spliced = self.spliced.get(h)
+        return self.children(h) if spliced is None else spliced
+
+    # ---------------------------------------------------
+    # conversion
+    # ---------------------------------------------------
+
+    def view(self, i=0):
+        if type(i) is not int:
+            return i   # a spliced ASTNode
+        return self.consts[self.values[i]] if self.tags[i] == ARENA_CONST else NodeView(self, i)
+
+    def to_tree(self, i=0):
+        """Materialize the subtree at `i` as ASTNodes, for passes that rewrite it."""
+        tags, values, consts = self.tags, self.values, self.consts
+        holder = ASTNode(None, None, [])
+        stack = [(i, holder, False)]
+        while stack:
+            j, parent, is_value = stack.pop()
+            if type(j) is not int:
+                n = j
+            elif tags[j] == ARENA_CONST:
+                n = consts[values[j]]
+            else:
+                v = values[j]
+                n = ASTNode(TAGS[tags[j]], consts[v] if v >= 0 else None, [])
+                stack.extend((k, n, False) for k in reversed(list(self.kids(j))))
+                if v < 0:
+                    stack.append((~v, n, True))
+            if is_value:
+                parent.value = n
+            else:
+                parent.children.append(n)
+        return freeze(holder.children[0])
+
+class NodeView(ASTNode):
+    # read-only ASTNode over one arena id, for passes written against ASTNode;
+    # views are made as they are reached and compare equal by (arena, id)
+    __slots__ = ("arena", "id")
+
+    def __init__(self, arena, i):
+        self.arena = arena
+        self.id = i
+
+    @property
+    def tag(self):
+        return TAGS[self.arena.tags[self.id]]
+
+    @property
+    def value(self):
+        v = self.arena.values[self.id]
+        return self.arena.consts[v] if v >= 0 else self.arena.view(~v)
+
+    @property
+    def children(self):
+        return tuple(map(self.arena.view, self.arena.kids(self.id)))
+
+    def __eq__(self, other):
+        return isinstance(other, NodeView) and other.arena is self.arena and other.id == self.id
+
+    def __hash__(self):
+        return hash((id(self.arena), self.id))
+
+    def __reduce__(self):
+        return self.arena.to_tree, (self.id,)
+
+# ast_dgm.py — node access by handle
+#
+# Backends read a tree through tag_of/value_of/kid/kids on a handle, so one
+# emitter walks ASTNodes (the handle is the node) and arenas (the handle is an
+# id) without making a view or a child tuple per node. A node-valued value comes
+# back as a handle; a constant leaf has no tag and its value is the constant.
+
+class TreeAccess:
+    __slots__ = ()
+
+    def tag_of(self, n):
+        return n.tag if isinstance(n, ASTNode) else None
+
+    def value_of(self, n):
+        return n.value if isinstance(n, ASTNode) else n
+
+    def kid(self, n, k):
+        return n.children[k]
+
+    def kids(self, n):
+        return n.children
+
+TREE = TreeAccess()
+
+def access(ast):
+    # (accessor, root handle) for an ASTNode tree or an Arena
+    return (ast, 0) if isinstance(ast, Arena) else (TREE, ast)
@@ -0,0 +1,279 @@
+# dgm_passes.py — Rinse v0.1.0
+# AST → AST optimization passes, run between the parser and the backends
+
+from ast_dgm import ASTNode, DGM_MAP
+
+# handlers forward to the builtin printer under this name (see tests/effects.rn)
+BUILTIN_PRINT = "core_print"
+
+# statement lists: an invocation directly inside one of these is a statement
+BODIES = (DGM_MAP["PROGRAM"], DGM_MAP["BLOCK"], DGM_MAP["EFFECT_BLOCK"],
+          DGM_MAP["HANDLER_DEF"], DGM_MAP["HANDLER_CASE"], DGM_MAP["ASYNC_BLOCK"],
+          DGM_MAP["PARALLEL_BLOCK"])
+
+# bodies that may run outside the dynamic extent of the handler around them
+ESCAPES = (DGM_MAP["FUNC_DEF"], DGM_MAP["METHOD_DEF"], DGM_MAP["TRAIT_IMPL"],
+           DGM_MAP["GENERIC_IMPL"], DGM_MAP["ASYNC_BLOCK"])
+
+def walk(node):
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if not isinstance(n, ASTNode):
+            continue
+        yield n
+        if isinstance(n.value, ASTNode):
+            stack.append(n.value)
+        stack.extend(reversed(n.children))
+
+def op_name(node):
+    # the operation an invocation node would perform, if it looks like one
+    if node.tag in (DGM_MAP["EFFECT_INVOKE"], DGM_MAP["FUNC_CALL"]) and isinstance(node.value, str):
+        return node.value
+    if node.tag == DGM_MAP["FLOW"] and node.value == "print":   # print(...) lexes as a keyword
+        return "print"
+    return None
+
+def builtin_print(args):
+    node = ASTNode(DGM_MAP["FLOW"], "print", tuple(args))
+    node.handler = False   # resolved: never dispatched to a handler
+    return node
+
+def substitute(node, binding):
+    if not isinstance(node, ASTNode):
+        return node
+    if node.tag == DGM_MAP["VAR"] and node.value in binding:
+        return binding[node.value]
+    value = substitute(node.value, binding) if isinstance(node.value, ASTNode) else node.value
+    copy = ASTNode(node.tag, value, tuple(substitute(c, binding) for c in node.children))
+    handler = getattr(node, "handler", None)
+    if handler is not None:
+        copy.handler = handler   # keep what resolve_effects decided for the original
+    return copy
+
+# ===================================================
+# Static effect-handler resolution
+# ===================================================
+
+def is_builtin_print(node):
+    # core_print(x), or a print the pass already resolved past every handler
+    return (op_name(node) == BUILTIN_PRINT
+            or (node.tag == DGM_MAP["FLOW"] and node.value == "print"
+                and getattr(node, "handler", None) is False))
+
+def pure_arg(node):
+    return node.tag in (DGM_MAP["VAR"], DGM_MAP["VALUE"])
+
+def inline_case(case, args, stmt_pos):
+    # replacement for `op(args)` when the case body is a single forwarding statement
+    params, body = case.value[1], case.children
+    if len(body) != 1 or len(params) != len(args):
+        return None
+    uses = dict.fromkeys(params, 0)
+    order = []   # params in the order the body evaluates them
+    for n in walk(body[0]):
+        if n.tag == DGM_MAP["VAR"] and n.value in uses:
+            uses[n.value] += 1
+            order.append(n.value)
+        elif n.tag == DGM_MAP["VAR"] and n.value == "resume":
+            return None
+        elif n.tag == DGM_MAP["METHOD_CALL"] or (op_name(n) is not None and not is_builtin_print(n)):
+            return None   # a handler could intercept it: keep the case's dynamic extent
+    for p, a in zip(params, args):
+        if uses[p] != 1 and not pure_arg(a):
+            return None   # the argument must still be evaluated exactly once
+    effectful = [p for p, a in zip(params, args) if not pure_arg(a)]
+    if [p for p in order if p in effectful] != effectful:
+        return None   # the call site evaluates its arguments left to right
+    binding = dict(zip(params, args))
+    s = body[0]
+    if s.tag == DGM_MAP["RETURN"] and not stmt_pos:
+        return substitute(s.children[0], binding)
+    # only a body that already bypasses every handler may become a builtin print:
+    # a plain print(x) there still goes to whatever print handler is outside
+    if stmt_pos and is_builtin_print(s) and len(s.children) == 1:
+        return builtin_print([substitute(s.children[0], binding)])
+    return None
+
+def resolve_node(node, env, stmt_pos, stats):
+    if not isinstance(node, ASTNode):
+        return node
+    op = op_name(node)
+    if op == BUILTIN_PRINT and len(node.children) == 1:
+        stats["builtin"] += 1
+        node = builtin_print(node.children)
+    elif op is not None and op in env:
+        case = env[op]
+        args = [resolve_node(a, env, False, stats) for a in node.children]
+        inlined = inline_case(case, args, stmt_pos)
+        if inlined is not None:
+            stats["inlined"] += 1
+            return inlined
+        stats["bound"] += 1
+        node.children = tuple(args)
+        node.handler = case   # the lexically enclosing case: no lookup by name at runtime
+        return node
+
+    if node.tag == DGM_MAP["HANDLER_DEF"]:
+        cases = [c for c in node.children if c.tag == DGM_MAP["HANDLER_CASE"]]
+        inner = dict(env)
+        inner.update((c.value[0], c) for c in cases)
+        for c in cases:
+            # case bodies run under the outer handlers only
+            c.children = tuple(resolve_node(s, env, True, stats) for s in c.children)
+        node.children = tuple(cases) + tuple(resolve_node(s, inner, True, stats)
+                                             for s in node.children if s.tag != DGM_MAP["HANDLER_CASE"])
+        return node
+
+    if node.tag in ESCAPES:
+        env = {}   # whatever handles these bodies is only known at runtime
+    body = node.tag in BODIES
+    if isinstance(node.value, ASTNode):
+        node.value = resolve_node(node.value, env, False, stats)
+    node.children = tuple(resolve_node(c, env, body, stats) for c in node.children)
+    return node
+
+def resolve_effects(ast, stats=None):
+    """Bind effect invocations to the handler case that lexically encloses them."""
+    stats = stats if stats is not None else {}
+    for key in ("bound", "inlined", "builtin"):
+        stats.setdefault(key, 0)
+    return resolve_node(ast, {}, True, stats)
+
+# ===================================================
+# Concrete types for top-level lets
+# ===================================================
+
+def type_name(base, args):
+    return f"{base}<{', '.join(args)}>" if args else base
+
+def literal_type(node, enums, variants):
+    if node.tag == DGM_MAP["BOOL"]:   # true/false parse to their own tag
+        return "bool"
+    if node.tag == DGM_MAP["VALUE"]:
+        if isinstance(node.value, bool):
+            return "bool"
+        return {int: "int", float: "float", str: "str"}.get(type(node.value))
+    if node.tag == DGM_MAP["FUNC_CALL"] and node.value in variants:
+        inst = infer_instance(node, enums, variants)
+        return type_name(*inst) if inst else None
+    return None
+
+def infer_instance(node, enums, variants):
+    # Some(42) → ("Option", ("int",)) when every type parameter is pinned by an argument
+    ename = variants[node.value]
+    params, fields = enums[ename][0], enums[ename][1][node.value]
+    binding = {}
+    for field, arg in zip(fields, node.children):
+        if field in params:
+            t = literal_type(arg, enums, variants)
+            if t is None or binding.setdefault(field, t) != t:
+                return None
+    if len(binding) != len(params):
+        return None
+    return ename, tuple(binding[p] for p in params)
+
+def top_level_lets(ast):
+    # the let statements of the program body; optimize_arena hands each statement
+    # over inside a block of its own
+    stack = list(reversed(ast.children))
+    while stack:
+        n = stack.pop()
+        if n.tag == DGM_MAP["BLOCK"]:
+            stack.extend(reversed(n.children))
+        elif n.tag == DGM_MAP["VAR"]:
+            yield n
+
+def annotate_lets(ast, stats=None):
+    """Bind each unannotated top-level let to the type of its value, for ir_gen."""
+    stats = stats if stats is not None else {}
+    stats.setdefault("lets_typed", 0)
+    enums, variants = {}, {}
+    for n in walk(ast):
+        if n.tag == DGM_MAP["ENUM_DEF"]:
+            ename, params = n.value
+            enums[ename] = (params, {v.value[0]: v.value[1] for v in n.children})
+            variants.update((v.value[0], ename) for v in n.children)
+    for let in top_level_lets(ast):
+        if not isinstance(let.value, tuple) or let.value[1] is not None or not let.children:
+            continue
+        # concrete_type in ir_gen reads {None: type} for a let written without one,
+        # and falls back to int by itself
+        typ = literal_type(let.children[0], enums, variants)
+        if typ not in (None, "int") and not hasattr(let, "types"):
+            let.types = {None: typ}
+            stats["lets_typed"] += 1
+    return ast
+
+PASSES = [resolve_effects, annotate_lets]
+
+def optimize(ast, stats=None):
+    for p in PASSES:
+        ast = p(ast, stats)
+    return ast
+
+# dgm_passes.py — arena input
+
+from ast_dgm import Arena, const_key
+
+def arena_needs_passes(arena):
+    # resolve_effects only rewrites under a handler or at a builtin-print call, and
+    # annotate_lets only types lets holding a non-int literal or a constructor call;
+    # without any of them both are no-ops
+    return (arena.has(DGM_MAP["HANDLER_DEF"]) or arena.has(DGM_MAP["ENUM_DEF"])
+            or const_key(BUILTIN_PRINT) in arena.const_ids
+            or any(type(v) in (float, bool) for v in arena.consts))
+
+# tags whose presence alone sends a statement through the passes (ENUM_DEF: the
+# constructors a let may be typed by)
+PASS_TAGS = (DGM_MAP["HANDLER_DEF"], DGM_MAP["ENUM_DEF"])
+
+def statement_needs_passes(arena, i, variants):
+    # arena_needs_passes for one statement: handlers, enums and builtin-print calls
+    # anywhere in it, or the statement is a let annotate_lets would type
+    tags, values, consts = arena.tags, arena.values, arena.consts
+    c = consts[values[i]] if values[i] >= 0 else None
+    if tags[i] == DGM_MAP["VAR"] and isinstance(c, tuple) and len(c) == 2:
+        k = arena.first[i]
+        if c[1] is None and k >= 0:
+            lit = consts[values[k]] if values[k] >= 0 else None
+            if (tags[k] == DGM_MAP["BOOL"] or (tags[k] == DGM_MAP["VALUE"] and type(lit) is not int)
+                    or (tags[k] == DGM_MAP["FUNC_CALL"] and lit in variants)):
+                return True
+    for j in arena.preorder(i):
+        if tags[j] in PASS_TAGS:
+            return True
+        v = values[j]
+        if tags[j] == DGM_MAP["FUNC_CALL"] and v >= 0 and consts[v] == BUILTIN_PRINT:
+            return True
+    return False
+
+def optimize_arena(arena, stats=None):
+    # only the statements a pass could touch become ASTNodes: each goes into its own
+    # block, so whatever the passes put next to it stays in its slot, and the result
+    # is spliced back into the arena's statement lists
+    variants = {arena.constant(v)[0] for j in arena.find(DGM_MAP["ENUM_DEF"])
+                for v in arena.children(j)}
+    bodies = []
+    for body in arena.children(0):
+        slots = [ASTNode(DGM_MAP["BLOCK"], None, (arena.to_tree(s),))
+                 if statement_needs_passes(arena, s, variants) else s
+                 for s in arena.kids(body)]
+        bodies.append((body, slots))
+    picked = tuple(slot for _, slots in bodies for slot in slots if type(slot) is not int)
+    program = ASTNode(DGM_MAP["PROGRAM"], None, (ASTNode(DGM_MAP["BLOCK"], None, picked),))
+    for p in PASSES:
+        program = p(program, stats)
+    for body, slots in bodies:
+        arena.spliced[body] = [h for slot in slots
+                               for h in ((slot,) if type(slot) is int else slot.children)]
+    return arena
+
+def optimize(ast, stats=None):
+    if isinstance(ast, Arena):
+        if not arena_needs_passes(ast):
+            return ast   # stays flat: the backends read it by id
+        return optimize_arena(ast, stats)
+    for p in PASSES:
+        ast = p(ast, stats)
+    return ast
@@ -0,0 +1,278 @@
+# incremental.py — Rinse v0.1.0
+# Incremental re-lexing and re-parsing for edited sources
+
+import bisect
+from array import array
+from lexer import master_pat, KEYWORDS, KIND_IDS, TokenBuffer, source_location
+from parser import Parser
+from ast_dgm import ASTNode, DGM_MAP, freeze
+
+class Shifted:
+    # ints where every entry from `gap` on still owes `owed`: shifting a suffix
+    # moves the gap instead of rewriting the entries, so a run of edits in one
+    # place touches only the entries between them
+    __slots__ = ("data", "gap", "owed")
+
+    def __init__(self, values=()):
+        self.data = array("q", values)
+        self.gap = len(self.data)
+        self.owed = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return array("q", map(self.__getitem__, range(*i.indices(len(self.data)))))
+        if i < 0:
+            i += len(self.data)
+        return self.data[i] + self.owed if i >= self.gap else self.data[i]
+
+    def append(self, v):
+        self.data.append(v - self.owed)
+
+    def settle(self, k):
+        # entries before k become exact, entries from k on owe `owed`
+        data, gap, owed = self.data, self.gap, self.owed
+        if owed and k < gap:
+            data[k:gap] = array("q", map((-owed).__add__, data[k:gap]))
+        elif owed and k > gap:
+            data[gap:k] = array("q", map(owed.__add__, data[gap:k]))
+        self.gap = k
+
+    def shift_from(self, k, delta):
+        self.settle(k)
+        self.owed += delta
+
+    def replace(self, a, b, values):
+        # entries [a, b) become the exact `values`
+        self.settle(b)
+        self.data[a:b] = array("q", values)
+        self.gap = a + len(values)
+
+class BlockInfo:
+    # a parsed `{ ... }`; every token index it holds is relative to its own "{",
+    # so an edit only renumbers the blocks on the path down to it
+    __slots__ = ("node", "span", "firsts", "ends", "leads", "inner", "live")
+
+    def __init__(self, node=None):
+        self.node = node
+        self.span = 0             # "}" minus "{"
+        self.firsts = Shifted()   # statement starts, parallel to node.children
+        self.ends = Shifted()     # statement ends
+        self.leads = Shifted()    # "{" of each nested block, parallel to inner
+        self.inner = []
+        self.live = True
+
+    def shift(self, hi, shift):
+        # relative positions at or past `hi` move by `shift`
+        self.span += shift
+        for arr in (self.firsts, self.ends, self.leads):
+            arr.shift_from(bisect.bisect_left(arr, hi), shift)
+
+class TrackingParser(Parser):
+    # records where every block and each of its statements start and end
+    parallel = False   # positions are recorded against this parser's own tokens
+    def __init__(self, tokens, root, base=0):
+        super().__init__(tokens)
+        self.within = [(root, base)]
+
+    def parse_block(self):
+        open_ = self.pos
+        parent, base = self.within[-1]
+        info = BlockInfo()
+        parent.inner.append(info)
+        parent.leads.append(open_ - base)
+        self.within.append((info, open_))
+        self.eat("SYMBOL")  # {
+        stmts = []
+        while self.peek()[1] != "}":
+            info.firsts.append(self.pos - open_)
+            stmts.append(self.parse_stmt())
+            info.ends.append(self.pos - open_)
+        info.span = self.pos - open_
+        self.eat("SYMBOL")  # }
+        self.within.pop()
+        info.node = ASTNode(DGM_MAP["BLOCK"], None, stmts)
+        return info.node
+
+def relex_tokens(text, pos, stop, resync):
+    # tokens of `text` from `pos`; stops at the first token past `stop` that starts at a
+    # position in `resync` (an old token start: lexing from there is unchanged)
+    kinds, starts, ends = array("B"), array("I"), array("I")
+    skip = ("SKIP", "NEWLINE")
+    for mo in master_pat.finditer(text, pos):
+        kind = mo.lastgroup
+        if kind in skip:
+            continue
+        s, e = mo.start(), mo.end()
+        if s >= stop and resync(s):
+            return kinds, starts, ends, s
+        if kind == "MISMATCH":
+            raise RuntimeError(f"Unexpected char {mo.group()!r} at {source_location(text, s)}")
+        if kind == "ID" and mo.group() in KEYWORDS:
+            kind = mo.group().upper()
+        kinds.append(KIND_IDS[kind])
+        starts.append(s)
+        ends.append(e)
+    return kinds, starts, ends, None
+
+class Document:
+    """Source text with its tokens and AST, kept current under edits."""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = TokenBuffer(text)
+        self.tokens.starts = Shifted(self.tokens.starts)
+        self.tokens.ends = Shifted(self.tokens.ends)
+        self.stats = {"edits": 0, "relexed": 0, "reparsed_stmts": 0, "reused_stmts": 0, "full": 0}
+        self.full_parse()
+
+    def full_parse(self):
+        self.stats["full"] += 1
+        self.root = BlockInfo()
+        self.ast = TrackingParser(self.tokens, self.root).parse()
+        # blocks whose children were copied into another node are not in the tree:
+        # edits inside them re-parse the enclosing statement instead
+        mark_live(self.root, self.ast)
+        return self.ast
+
+    # ---------------------------------------------------
+    # lexing
+    # ---------------------------------------------------
+
+    def relex(self, offset, deleted, inserted):
+        # returns the replaced old token range [a, b) and the new token count m
+        buf, old = self.tokens, self.text
+        text = old[:offset] + inserted + old[offset + deleted:]
+        delta = len(inserted) - deleted
+        starts = buf.starts
+        n = len(buf.kinds)
+        # the token touching the edit may grow or merge, so lexing restarts at its start
+        a = max(bisect.bisect_right(starts, offset) - 1, 0)
+        if a < n and a > 0 and buf.ends[a - 1] >= offset:
+            a -= 1
+        pos = starts[a] if a < n else (buf.ends[n - 1] if n else 0)
+        first_after = bisect.bisect_left(starts, offset + deleted)
+
+        def resync(s):
+            i = bisect.bisect_left(starts, s - delta, first_after)
+            return i < n and starts[i] == s - delta
+
+        kinds, new_starts, new_ends, at = relex_tokens(text, pos, offset + len(inserted), resync)
+        b = n if at is None else bisect.bisect_left(starts, at - delta, first_after)
+        # only the damaged window is rewritten; later tokens owe `delta` lazily
+        buf.kinds[a:b] = kinds
+        for arr, fresh in ((buf.starts, new_starts), (buf.ends, new_ends)):
+            arr.shift_from(b, delta)
+            arr.replace(a, b, fresh)
+        buf.source = text
+        buf.lines = None
+        self.text = text
+        self.stats["relexed"] += len(kinds)
+        return a, b, len(kinds)
+
+    # ---------------------------------------------------
+    # parsing
+    # ---------------------------------------------------
+
+    def enclosing(self, a, b):
+        # [(block, "{" index)] from the root down to the innermost block whose
+        # braces strictly contain old tokens [a, b)
+        path = [(self.root, 0)]
+        blk, base = self.root, 0
+        while True:
+            k = bisect.bisect_left(blk.leads, a - base) - 1
+            if k < 0:
+                return path
+            open_ = base + blk.leads[k]
+            blk = blk.inner[k]
+            if not b <= open_ + blk.span:
+                return path
+            base = open_
+            path.append((blk, base))
+
+    def reparse_block(self, blk, base, a, b, shift):
+        # statements ending well before the damage (parsing peeks one token past a statement)
+        # and statements starting after it are kept; the ones in between are parsed again
+        firsts, ends = blk.firsts, blk.ends
+        keep_to = bisect.bisect_left(ends, a - 1 - base)
+        after = bisect.bisect_left(firsts, b - base)
+        close = base + blk.span + shift
+
+        def anchor(pos):
+            rel = pos - shift - base
+            k = bisect.bisect_left(firsts, rel, after)
+            return k if k < len(firsts) and firsts[k] == rel else None
+
+        scratch = BlockInfo()
+        p = TrackingParser(self.tokens, scratch, base)
+        p.pos = base + ends[keep_to - 1] if keep_to else base + 1
+        fresh, ranges = [], []
+        while anchor(p.pos) is None and p.pos != close:
+            if p.pos > close:
+                raise SyntaxError("edit crosses a block boundary")
+            start = p.pos
+            fresh.append(p.parse_stmt())
+            ranges.append((start - base, p.pos - base))
+        resume = anchor(p.pos)
+        if resume is None:
+            resume = len(firsts)
+        lo = firsts[keep_to] if keep_to < len(firsts) else 1
+        hi = firsts[resume] if resume < len(firsts) else blk.span
+
+        children = tuple(blk.node.children)
+        blk.node.children = children[:keep_to] + tuple(map(freeze, fresh)) + children[resume:]
+        firsts.shift_from(resume, shift)
+        firsts.replace(keep_to, resume, [s for s, e in ranges])
+        ends.shift_from(resume, shift)
+        ends.replace(keep_to, resume, [e for s, e in ranges])
+        # nested blocks of the replaced statements give way to the fresh ones
+        i, j = bisect.bisect_left(blk.leads, lo), bisect.bisect_left(blk.leads, hi)
+        blk.leads.shift_from(j, shift)
+        blk.leads.replace(i, j, scratch.leads.data)
+        blk.inner[i:j] = scratch.inner
+        blk.span += shift
+        self.stats["reparsed_stmts"] += len(fresh)
+        self.stats["reused_stmts"] += keep_to + len(children) - resume
+        return base + hi
+
+    def edit(self, offset, deleted, inserted):
+        """Apply (offset, deleted length, inserted text) and bring tokens and AST up to date."""
+        self.stats["edits"] += 1
+        a, b, m = self.relex(offset, deleted, inserted)
+        shift = m - (b - a)
+        path = self.enclosing(a, b)
+        while len(path) > 1:
+            blk, base = path.pop()
+            if not blk.live:
+                continue
+            try:
+                hi = self.reparse_block(blk, base, a, b, shift)
+            except (SyntaxError, IndexError):
+                continue   # the block is only updated once its statements parse
+            # the enclosing blocks only see their tail move
+            for outer, outer_base in path:
+                outer.shift(hi - outer_base, shift)
+            return self.ast
+        return self.full_parse()
+
+def mark_live(root, ast):
+    live = {id(n) for n in walk_blocks(ast)}
+    stack = list(root.inner)
+    while stack:
+        info = stack.pop()
+        info.live = id(info.node) in live
+        stack.extend(info.inner)
+
+def walk_blocks(node):
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if not isinstance(n, ASTNode):
+            continue
+        if n.tag == DGM_MAP["BLOCK"]:
+            yield n
+        if isinstance(n.value, ASTNode):
+            stack.append(n.value)
+        stack.extend(n.children)
@@ -30,3 +30,88 @@ def gen_ir(ast):
 
     builder.ret(ir.Constant(ir.IntType(32), 0))
     return str(module)
+
+# ir_gen.py — typed locals from annotated lets
+
+LLVM_TYPES = {
+    "int": ir.IntType(32),
+    "bool": ir.IntType(1),
+    "float": ir.DoubleType(),
+}
+
+def concrete_type(node, typ=None):
+    # a let's annotation, or the type annotate_lets() bound for a let written without one
+    types = getattr(node, "types", None) or {}
+    typ = types.get(typ, typ)
+    return typ if typ in LLVM_TYPES else "int"
+
+def gen_ir(ast):
+    module = ir.Module(name="main")
+    func_type = ir.FunctionType(ir.IntType(32), [])
+    main = ir.Function(module, func_type, name="main")
+    block = main.append_basic_block(name="entry")
+    builder = ir.IRBuilder(block)
+
+    variables = {}
+    printers = {}
+
+    for stmt in ast.children[0].children:
+        if stmt.tag == DGM_MAP["VAR"]:
+            name, typ = stmt.value
+            typ = concrete_type(stmt, typ)
+            val_node = stmt.children[0]
+            alloca = builder.alloca(LLVM_TYPES[typ], name=name)
+            builder.store(ir.Constant(LLVM_TYPES[typ], val_node.value), alloca)
+            variables[name] = (alloca, typ)
+
+        elif stmt.tag == DGM_MAP["FLOW"]:
+            var_name = stmt.children[0].value
+            alloca, typ = variables[var_name]
+            val = builder.load(alloca, name=var_name)
+            if typ not in printers:
+                fnty = ir.FunctionType(ir.VoidType(), [LLVM_TYPES[typ]])
+                printers[typ] = ir.Function(module, fnty, name=f"print_{typ}")
+            builder.call(printers[typ], [val])
+
+    builder.ret(ir.Constant(ir.IntType(32), 0))
+    return str(module)
+
+# ir_gen.py — one emitter over node handles
+
+from ast_dgm import access
+
+def gen_ir(ast):
+    # trees and arenas alike go through the accessor; an arena id carries no
+    # `types` binding, so concrete_type() falls back to the annotation for it
+    nodes, root = access(ast)
+    tag_of, value_of, kid, kids = nodes.tag_of, nodes.value_of, nodes.kid, nodes.kids
+
+    module = ir.Module(name="main")
+    func_type = ir.FunctionType(ir.IntType(32), [])
+    main = ir.Function(module, func_type, name="main")
+    block = main.append_basic_block(name="entry")
+    builder = ir.IRBuilder(block)
+
+    variables = {}
+    printers = {}
+
+    for stmt in kids(kid(root, 0)):
+        tag = tag_of(stmt)
+        if tag == DGM_MAP["VAR"]:
+            name, typ = value_of(stmt)
+            typ = concrete_type(stmt, typ)
+            alloca = builder.alloca(LLVM_TYPES[typ], name=name)
+            builder.store(ir.Constant(LLVM_TYPES[typ], value_of(kid(stmt, 0))), alloca)
+            variables[name] = (alloca, typ)
+
+        elif tag == DGM_MAP["FLOW"]:
+            var_name = value_of(kid(stmt, 0))
+            alloca, typ = variables[var_name]
+            val = builder.load(alloca, name=var_name)
+            if typ not in printers:
+                fnty = ir.FunctionType(ir.VoidType(), [LLVM_TYPES[typ]])
+                printers[typ] = ir.Function(module, fnty, name=f"print_{typ}")
+            builder.call(printers[typ], [val])
+
+    builder.ret(ir.Constant(ir.IntType(32), 0))
+    return str(module)
@@ -5,11 +5,14 @@ import re
 
 KEYWORDS = {
     "init", "process", "item", "flow",
-    "let", "print", "parallel", "is", "return"
+    "let", "print", "parallel", "is", "return",
     "init", "process", "item", "flow", "let", "print",
     "parallel", "is", "return",
     "if", "else", "struct", "tuple", "list", "array", "nest", "proof",
-    "true", "false"
+    "true", "false", "and", "or", "not",
+    "for", "while", "break", "continue", "switch", "case", "default",
+    "trait", "impl", "enum", "effect", "handle", "async", "do",
+    "in", "with", "yield"
 }
 
 
@@ -17,8 +20,8 @@ TOKEN_SPEC = [
     ("NUMBER",   r"\d+"),
     ("STRING",   r"\".*?\""),
     ("ID",       r"[A-Za-z_][A-Za-z0-9_]*"),
-    ("OP",       r"[+\-*/=]"),
-    ("SYMBOL",   r"[{}():,]"),
+    ("OP",       r">>=|<-|<=|>=|==|!=|\.\.|[+\-*/=^|]"),
+    ("SYMBOL",   r"[{}():,.\[\]<>]"),
     ("NEWLINE",  r"\n"),
     ("SKIP",     r"[ \t]+"),
     ("MISMATCH", r"."),
@@ -47,3 +50,456 @@ def tokenize(code):
 if __name__ == "__main__":
     code = 'init main { let x: int = 12 print(x) }'
     print(tokenize(code))
+
+# lexer.py — streaming tokenizer over mmap
+
+import mmap
+
+master_pat_bytes = re.compile("|".join("(?P<%s>%s)" % pair for pair in TOKEN_SPEC).encode())
+
+def source_location(source, offset):
+    # (line, column) of an offset, both 1-based; only computed to report an error
+    nl = "\n" if isinstance(source, str) else b"\n"
+    line, start, at = 1, 0, source.find(nl)
+    while at != -1 and at < offset:
+        line, start = line + 1, at + 1
+        at = source.find(nl, start)
+    return line, offset - start + 1
+
+def iter_tokens(source):
+    # lazily yields (kind, value); source may be str, bytes or a buffer such as an mmap
+    pat = master_pat if isinstance(source, str) else master_pat_bytes
+    for mo in pat.finditer(source):
+        kind = mo.lastgroup
+        if kind == "SKIP" or kind == "NEWLINE":
+            continue
+        value = mo.group()
+        if not isinstance(value, str):
+            try:
+                value = value.decode("utf-8")
+            except UnicodeDecodeError:   # MISMATCH on part of a multi-byte character
+                raise RuntimeError(f"Unexpected char {value!r} at {source_location(source, mo.start())}")
+        if kind == "ID" and value in KEYWORDS:
+            kind = value.upper()
+        elif kind == "NUMBER":
+            value = int(value)
+        elif kind == "STRING":
+            value = value.strip('"')
+        elif kind == "MISMATCH":
+            raise RuntimeError(f"Unexpected char {value!r} at {source_location(source, mo.start())}")
+        yield (kind, value)
+
+def tokenize_file(path):
+    # the file is mapped, never read into one str; the map closes when the stream ends
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:   # empty file
+            return
+    with mm:
+        yield from iter_tokens(mm)
+
+def tokenize(code):
+    return list(iter_tokens(code))
+
+class TokenStream:
+    # small lookahead window over a token iterator; indices stay absolute positions
+    __slots__ = ("it", "buf", "base")
+
+    RELEASE_AT = 64   # consumed tokens kept before the window is compacted
+
+    def __init__(self, tokens):
+        self.it = iter(tokens)
+        self.buf = []
+        self.base = 0
+
+    def fill(self, i):
+        while i - self.base >= len(self.buf):
+            tok = next(self.it, None)
+            if tok is None:
+                return False
+            self.buf.append(tok)
+        return True
+
+    def get(self, i, default=(None, None)):
+        if i < self.base:
+            raise IndexError(f"token {i} already released")
+        return self.buf[i - self.base] if self.fill(i) else default
+
+    def __getitem__(self, i):
+        tok = self.get(i, None)
+        if tok is None:
+            raise IndexError("token index out of range")
+        return tok
+
+    def release(self, i):
+        # tokens before absolute position i will not be looked at again
+        if i - self.base >= self.RELEASE_AT:
+            del self.buf[:i - self.base]
+            self.base = i
+
+    def kind_at(self, i):
+        tok = self.get(i)
+        return KIND_IDS[tok[0]] if tok[0] is not None else 0
+
+    def span(self, i):
+        return None   # plain (kind, value) tokens carry no offsets
+
+    def location(self, i):
+        return None
+
+# lexer.py — compact token buffer with source spans
+
+import bisect
+from array import array
+
+KIND_NAMES = [None] + [k for k, _ in TOKEN_SPEC] + sorted(k.upper() for k in KEYWORDS)
+KIND_IDS = {name: i for i, name in enumerate(KIND_NAMES)}
+KEYWORD_BYTES = {k.encode(): KIND_IDS[k.upper()] for k in KEYWORDS}
+
+class Token:
+    # (kind, value) view of one buffered token; the value is decoded only when read
+    __slots__ = ("buf", "i")
+
+    def __init__(self, buf, i):
+        self.buf = buf
+        self.i = i
+
+    def __getitem__(self, k):
+        if k == 0 or k == -2:
+            return KIND_NAMES[self.buf.kinds[self.i]]
+        if k == 1 or k == -1:
+            return self.buf.value(self.i)
+        raise IndexError("token index out of range")
+
+    def __iter__(self):
+        return iter((KIND_NAMES[self.buf.kinds[self.i]], self.buf.value(self.i)))
+
+    def __len__(self):
+        return 2
+
+    def __eq__(self, other):
+        return tuple(self) == other
+
+    def __repr__(self):
+        return repr(tuple(self))
+
+class TokenBuffer:
+    # struct of arrays: one byte of kind id and two 32-bit offsets per token;
+    # the source (str, bytes or mmap) stays the only copy of the text
+    __slots__ = ("source", "kinds", "starts", "ends", "lines")
+
+    def __init__(self, source):
+        self.source = source
+        self.kinds = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.lines = None   # newline offsets, built on the first diagnostic
+        if not isinstance(source, str) or source.isascii():
+            data = source.encode("ascii") if isinstance(source, str) else source
+            dfa_scan(data, self.kinds, self.starts, self.ends, self.location_of)
+            return
+        text = isinstance(source, str)
+        pat = master_pat if text else master_pat_bytes
+        keywords = KEYWORDS if text else KEYWORD_BYTES
+        skip = (KIND_IDS["SKIP"], KIND_IDS["NEWLINE"])
+        mismatch = KIND_IDS["MISMATCH"]
+        for mo in pat.finditer(source):
+            kind = KIND_IDS[mo.lastgroup]
+            if kind in skip:
+                continue
+            if kind == mismatch:
+                raise RuntimeError(f"Unexpected char {mo.group()!r} at {self.location_of(mo.start())}")
+            if kind == KIND_IDS["ID"]:
+                word = mo.group()
+                if word in keywords:
+                    kind = KIND_IDS[word.upper()] if text else keywords[word]
+            self.kinds.append(kind)
+            self.starts.append(mo.start())
+            self.ends.append(mo.end())
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:   # empty file
+                return cls(b"")
+        return cls(mm)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def kind_at(self, i):
+        return self.kinds[i] if i < len(self.kinds) else 0
+
+    def value(self, i):
+        raw = self.source[self.starts[i]:self.ends[i]]
+        if not isinstance(raw, str):
+            raw = raw.decode("utf-8")
+        kind = KIND_NAMES[self.kinds[i]]
+        if kind == "NUMBER":
+            return int(raw)
+        if kind == "STRING":
+            return raw.strip('"')
+        return raw
+
+    def get(self, i, default=(None, None)):
+        return Token(self, i) if i < len(self.kinds) else default
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self.kinds):
+            raise IndexError("token index out of range")
+        return Token(self, i)
+
+    def release(self, i):
+        pass   # offsets are cheap enough to keep for the whole parse
+
+    def slice(self, a, b):
+        # tokens [a, b) as a buffer over a copy of just their text; unlike an
+        # mmap-backed buffer it pickles, so it can be sent to another process
+        part = TokenBuffer.__new__(TokenBuffer)
+        base = self.starts[a] if a < b else 0
+        part.source = self.source[base:self.ends[b - 1]] if a < b else self.source[:0]
+        part.kinds = self.kinds[a:b]
+        part.starts = array("I", map((-base).__add__, self.starts[a:b]))
+        part.ends = array("I", map((-base).__add__, self.ends[a:b]))
+        part.lines = None
+        return part
+
+    def span(self, i):
+        if i >= len(self.kinds):
+            return None
+        return self.starts[i], self.ends[i]
+
+    def location_of(self, offset):
+        # (line, column), both 1-based
+        if self.lines is None:
+            nl = "\n" if isinstance(self.source, str) else b"\n"
+            lines, at = array("I"), self.source.find(nl)
+            while at != -1:
+                lines.append(at)
+                at = self.source.find(nl, at + 1)
+            self.lines = lines
+        line = bisect.bisect_left(self.lines, offset)
+        start = self.lines[line - 1] + 1 if line else 0
+        return line + 1, offset - start + 1
+
+    def location(self, i):
+        span = self.span(i)
+        return self.location_of(span[0]) if span else None
+
+# lexer.py — table-driven DFA generated from TOKEN_SPEC
+
+try:
+    from re import _parser as sre_parse
+except ImportError:   # Python < 3.11
+    import sre_parse
+
+DFA_WINDOW = 1 << 16   # bytes translated to character classes at a time
+
+BYTE_CATEGORIES = {
+    "CATEGORY_DIGIT": frozenset(range(48, 58)),
+    "CATEGORY_SPACE": frozenset(b" \t\n\r\f\v"),
+    "CATEGORY_WORD": frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_"),
+}
+ALL_BYTES = frozenset(range(256))
+
+def byte_set(items):
+    # the bytes an IN / LITERAL / ANY item accepts
+    chars, negate = set(), False
+    for op, av in items:
+        op = str(op)
+        if op == "LITERAL":
+            chars.add(av)
+        elif op == "RANGE":
+            chars.update(range(av[0], av[1] + 1))
+        elif op == "CATEGORY":
+            chars.update(BYTE_CATEGORIES[str(av)])
+        elif op == "NEGATE":
+            negate = True
+        else:
+            raise ValueError(f"unsupported class item {op}")
+    return frozenset(ALL_BYTES - chars if negate else chars)
+
+class NFA:
+    def __init__(self):
+        self.eps = []     # state → [state]
+        self.edges = []   # state → [(byte set, state)]
+
+    def state(self):
+        self.eps.append([])
+        self.edges.append([])
+        return len(self.eps) - 1
+
+    def build(self, items, start):
+        # Thompson construction over sre_parse output; returns the end state
+        end = start
+        for op, av in items:
+            op = str(op)
+            if op in ("LITERAL", "NOT_LITERAL", "ANY", "IN"):
+                if op == "LITERAL":
+                    chars = frozenset((av,))
+                elif op == "NOT_LITERAL":
+                    chars = ALL_BYTES - {av}
+                elif op == "ANY":
+                    chars = ALL_BYTES - {10}
+                else:
+                    chars = byte_set(av)
+                nxt = self.state()
+                self.edges[end].append((chars, nxt))
+                end = nxt
+            elif op in ("MAX_REPEAT", "MIN_REPEAT"):
+                lo, hi, body = av
+                for _ in range(lo):
+                    end = self.build(body, end)
+                if hi == sre_parse.MAXREPEAT:
+                    loop = self.state()
+                    self.eps[end].append(loop)
+                    self.eps[self.build(body, loop)].append(loop)
+                    end = loop
+                else:
+                    for _ in range(hi - lo):
+                        nxt = self.build(body, end)
+                        self.eps[end].append(nxt)
+                        end = nxt
+            elif op == "SUBPATTERN":
+                end = self.build(av[-1], end)
+            elif op == "BRANCH":
+                join = self.state()
+                for alt in av[1]:
+                    self.eps[self.build(alt, end)].append(join)
+                end = join
+            else:
+                raise ValueError(f"unsupported regex op {op}")
+        return end
+
+    def closure(self, states):
+        seen, stack = set(states), list(states)
+        while stack:
+            for t in self.eps[stack.pop()]:
+                if t not in seen:
+                    seen.add(t)
+                    stack.append(t)
+        return frozenset(seen)
+
+def build_dfa(spec):
+    """(class table, flat transition table, class count, accept kinds) for `spec`."""
+    nfa = NFA()
+    start = nfa.state()
+    accepts, owner, lazy = {}, {}, set()
+    for rank, (kind, pattern) in enumerate(spec):
+        parsed = list(sre_parse.parse(pattern.encode()))
+        first = nfa.state()
+        nfa.eps[start].append(first)
+        before = len(nfa.eps)
+        end = nfa.build(parsed, first)
+        for st in [first] + list(range(before, len(nfa.eps))):
+            owner[st] = rank
+        accepts[end] = rank
+        if "MIN_REPEAT" in str(parsed):
+            lazy.add(rank)   # .*? stops at the first way to finish
+
+    # bytes that every edge treats alike share one character class
+    sets = sorted({chars for edges in nfa.edges for chars, _ in edges}, key=sorted)
+    signature = {}
+    table = bytearray(256)
+    for b in range(256):
+        sig = tuple(b in chars for chars in sets)
+        table[b] = signature.setdefault(sig, len(signature))
+    nclasses = len(signature)
+    reps = {c: b for b, c in reversed(list(enumerate(table)))}
+
+    def settle(states):
+        # keep the best-ranked accept; a finished lazy token drops its own continuations
+        done = [accepts[st] for st in states if st in accepts]
+        for rank in done:
+            if rank in lazy:
+                states = frozenset(st for st in states if owner.get(st) != rank or st in accepts)
+        return states, (min(done) + 1 if done else 0)
+
+    first, _ = settle(nfa.closure({start}))
+    index, queue, rows, kinds = {first: 0}, [first], [], [0]
+    while queue:
+        states = queue.pop(0)
+        row = [-1] * nclasses
+        for c in range(nclasses):
+            b = reps[c]
+            targets = {t for st in states for chars, t in nfa.edges[st] if b in chars}
+            if not targets:
+                continue
+            nxt, kind = settle(nfa.closure(targets))
+            if nxt not in index:
+                index[nxt] = len(kinds)
+                kinds.append(kind)
+                queue.append(nxt)
+            row[c] = index[nxt]
+        rows.append(row)
+    trans = array("i", [t for row in rows for t in row])
+    return bytes(table), trans, nclasses, [KIND_IDS[spec[k - 1][0]] if k else 0 for k in kinds]
+
+def perfect_hash(words):
+    # smallest table where (len * a + first * b + last) % size has no collisions
+    words = [w.encode() for w in words]
+    for size in range(len(words), 8 * len(words)):
+        for a in range(1, 64):
+            for b in range(1, 64):
+                slots = {(len(w) * a + w[0] * b + w[-1]) % size for w in words}
+                if len(slots) == len(words):
+                    table = [None] * size
+                    for w in words:
+                        table[(len(w) * a + w[0] * b + w[-1]) % size] = w
+                    return a, b, size, table
+    raise ValueError("no perfect hash found")
+
+DFA_CLASSES, DFA_TRANS, DFA_NCLASSES, DFA_KINDS = build_dfa(TOKEN_SPEC)
+KW_A, KW_B, KW_SIZE, KW_TABLE = perfect_hash(sorted(KEYWORDS))
+KW_KINDS = [KIND_IDS[w.decode().upper()] if w else 0 for w in KW_TABLE]
+# one list per state, plus a rejecting column for the window sentinel class
+DFA_ROWS = [list(DFA_TRANS[s:s + DFA_NCLASSES]) + [-1] for s in range(0, len(DFA_TRANS), DFA_NCLASSES)]
+
+def dfa_scan(data, kinds, starts, ends, location_of):
+    # maximal munch over character classes; data is bytes or an mmap
+    rows = DFA_ROWS
+    accept = DFA_KINDS
+    sentinel = bytes((DFA_NCLASSES,))   # a class every state rejects: ends each window
+    id_kind, skip, newline = KIND_IDS["ID"], KIND_IDS["SKIP"], KIND_IDS["NEWLINE"]
+    mismatch = KIND_IDS["MISMATCH"]
+    n = len(data)
+    base, width = 0, DFA_WINDOW
+    cls = data[:width].translate(DFA_CLASSES) + sentinel
+    limit = len(cls) - 1   # window-relative end of real input
+    i = 0   # window-relative
+    while base + i < n:
+        s, j, kind, end = 0, i, 0, i
+        while True:
+            s = rows[s][cls[j]]
+            if s < 0:
+                break
+            j += 1
+            k = accept[s]
+            if k:
+                kind, end = k, j
+        if j == limit and base + limit < n:
+            # the token may run past the window: rescan it from its start in a wider one
+            base += i
+            width = max(width, 2 * (limit - i))
+            cls = data[base:base + width].translate(DFA_CLASSES) + sentinel
+            limit, i = len(cls) - 1, 0
+            continue
+        if kind == skip or kind == newline:
+            i = end
+            continue
+        if kind == mismatch or not kind:
+            at = base + i
+            char = bytes(data[at:at + 4]).decode("utf-8", "replace")[0]   # a whole UTF-8 sequence
+            raise RuntimeError(f"Unexpected char {char!r} at {location_of(at)}")
+        if kind == id_kind:
+            word = data[base + i:base + end]
+            slot = (len(word) * KW_A + word[0] * KW_B + word[-1]) % KW_SIZE
+            if KW_TABLE[slot] == word:
+                kind = KW_KINDS[slot]
+        kinds.append(kind)
+        starts.append(base + i)
+        ends.append(base + end)
+        i = end
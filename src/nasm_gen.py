@@ -252,42 +252,41 @@ def gen_nasm(ast):
     return "\n".join(lines)
 
 
-- **Structs/Tuples/Lists**:  
-- Represented in VESE as Python dicts/lists.  
-- NASM representation is abstracted to “heap-like” allocations.  
-
-- **Proofs**:  
-- Compile to conditionals, but with an assertion that halts VESE if false.  
-
----
-
-# 🔹 VESE Runtime Extensions (sketch)
-
-```python
-elif op == "cmp":
- reg1, reg2 = parts[1].strip(","), parts[2]
- self.flags["cmp"] = self.registers[reg1] - self.registers.get(reg2, int(reg2))
-
-elif op == "jg":
- if self.flags["cmp"] > 0:
-     self.pc = self.labels[parts[1]]
-
-elif op == "jl":
- if self.flags["cmp"] < 0:
-     self.pc = self.labels[parts[1]]
-
-elif op == "je":
- if self.flags["cmp"] == 0:
-     self.pc = self.labels[parts[1]]
-
-elif op == "pow":
- base, exp = self.registers["eax"], self.registers["ebx"]
- self.registers["eax"] = pow(base, exp)
-
-elif op == "assert":
- cond = self.stack.pop()
- if not cond:
-     raise AssertionError("Proof failed")
+# - **Structs/Tuples/Lists**:
+# - Represented in VESE as Python dicts/lists.
+# - NASM representation is abstracted to “heap-like” allocations.
+#
+# - **Proofs**:
+# - Compile to conditionals, but with an assertion that halts VESE if false.
+#
+# ---
+#
+# # 🔹 VESE Runtime Extensions (sketch)
+#
+# elif op == "cmp":
+#  reg1, reg2 = parts[1].strip(","), parts[2]
+#  self.flags["cmp"] = self.registers[reg1] - self.registers.get(reg2, int(reg2))
+#
+# elif op == "jg":
+#  if self.flags["cmp"] > 0:
+#      self.pc = self.labels[parts[1]]
+#
+# elif op == "jl":
+#  if self.flags["cmp"] < 0:
+#      self.pc = self.labels[parts[1]]
+#
+# elif op == "je":
+#  if self.flags["cmp"] == 0:
+#      self.pc = self.labels[parts[1]]
+#
+# elif op == "pow":
+#  base, exp = self.registers["eax"], self.registers["ebx"]
+#  self.registers["eax"] = pow(base, exp)
+#
+# elif op == "assert":
+#  cond = self.stack.pop()
+#  if not cond:
+#      raise AssertionError("Proof failed")
 
 label_counter = 0
 def new_label(prefix="L"):
@@ -465,8 +464,19 @@ def gen_nasm(ast):
                 lines.append("    push eax")
             lines.append(f"    call {expr.value}")
         elif expr.tag == DGM_MAP["EXPR"]:
-            # [arithmetic same as before...]
-            pass
+            op = expr.value
+            left, right = expr.children
+            emit_expr(left, var_map, lines)
+            lines.append("    push eax")
+            emit_expr(right, var_map, lines)
+            lines.append("    mov ebx, eax")
+            lines.append("    pop eax")
+            if op == "+": lines.append("    add eax, ebx")
+            elif op == "-": lines.append("    sub eax, ebx")
+            elif op == "*": lines.append("    imul eax, ebx")
+            elif op == "/":
+                lines.append("    xor edx, edx")
+                lines.append("    idiv ebx")
 
     for stmt in ast.children[0].children:
         if stmt.tag == DGM_MAP["FUNC_DEF"]:
@@ -495,11 +505,138 @@ def gen_nasm(ast):
             lines.append("    push eax")
             lines.append("    call print_int")
 
+        elif stmt.tag == DGM_MAP["RETURN"]:
+            emit_expr(stmt.children[0], var_map, lines)
+            lines.append("    ret")
+
     lines.append("    xor eax, eax")
     lines.append("    ret")
     return "\n".join(lines)
 
-elif stmt.tag == DGM_MAP["RETURN"]:
-    emit_expr(stmt.children[0], var_map, lines)
-    lines.append("    ret")
 
+# nasm_gen.py — one emitter over node handles
+
+import itertools
+from ast_dgm import DGM_MAP, access
+
+# eax, ebx and edx are scratch (idiv writes edx): variables never live in registers,
+# each gets a dword slot below the saved ebx, and parameters sit above ebp (cdecl)
+SETCC = {"==": "sete", "!=": "setne", "<": "setl", "<=": "setle", ">": "setg", ">=": "setge"}
+
+def gen_nasm(ast):
+    # trees and arenas alike go through the accessor: no node views, no child tuples
+    nodes, root = access(ast)
+    tag_of, value_of, kid, kids = nodes.tag_of, nodes.value_of, nodes.kid, nodes.kids
+
+    lines = []
+    lines.append("section .data")
+    lines.append("section .text")
+    lines.append("global _main")
+    functions = []
+    counter = itertools.count()
+    label = lambda prefix: f"{prefix}{next(counter)}"   # numbered per program
+    epilogue = ["    mov ebx, dword [ebp-4]", "    mov esp, ebp", "    pop ebp", "    ret"]
+
+    def emit_expr(expr, frame, out):
+        tag, value = tag_of(expr), value_of(expr)
+        if tag == DGM_MAP["VAR"]:
+            out.append(f"    mov eax, {frame[value]}")
+        elif tag == DGM_MAP["VALUE"]:
+            out.append(f"    mov eax, {value}")
+        elif tag == DGM_MAP["BOOL"]:
+            out.append(f"    mov eax, {1 if value == 'true' else 0}")
+        elif tag == DGM_MAP["FIELD"]:
+            base, field = value
+            out.append(f"    ; load field {field} from {base}")
+        elif tag == DGM_MAP["FUNC_CALL"]:
+            args = list(kids(expr))
+            for arg in reversed(args):
+                emit_expr(arg, frame, out)
+                out.append("    push eax")
+            out.append(f"    call {value}")
+            if args:
+                out.append(f"    add esp, {4 * len(args)}")
+        elif tag == DGM_MAP["EXPR"]:
+            emit_expr(kid(expr, 0), frame, out)
+            out.append("    push eax")
+            emit_expr(kid(expr, 1), frame, out)
+            out.append("    mov ebx, eax")
+            out.append("    pop eax")
+            if value == "+": out.append("    add eax, ebx")
+            elif value == "-": out.append("    sub eax, ebx")
+            elif value == "*": out.append("    imul eax, ebx")
+            elif value == "/":
+                # idiv truncates; Rinse divides ints with floor
+                done = label("div")
+                out.append("    cdq")
+                out.append("    idiv ebx")
+                out.append("    test edx, edx")
+                out.append(f"    jz {done}")
+                out.append("    xor edx, ebx")
+                out.append(f"    jns {done}")
+                out.append("    dec eax")
+                out.append(f"{done}:")
+            elif value in SETCC:
+                out.append("    cmp eax, ebx")
+                out.append(f"    {SETCC[value]} al")
+                out.append("    movzx eax, al")
+            elif value in ("and", "or"):
+                out.append("    test eax, eax")
+                out.append("    setne al")
+                out.append("    test ebx, ebx")
+                out.append("    setne bl")
+                out.append(f"    {value} al, bl")
+                out.append("    movzx eax, al")
+
+    def emit_body(name, stmts, params=()):
+        out = [f"{name}:", "    push ebp", "    mov ebp, esp", "    push ebx", None]
+        frame = {p: f"dword [ebp+{8 + 4 * k}]" for k, p in enumerate(params)}
+        slots = [0]
+
+        def emit_stmts(stmts):
+            for stmt in stmts:
+                tag = tag_of(stmt)
+                if tag == DGM_MAP["FUNC_DEF"]:
+                    emit_body(value_of(stmt), kids(kid(stmt, 1)), value_of(kid(stmt, 0)))
+
+                elif tag == DGM_MAP["FUNC_CALL"]:
+                    emit_expr(stmt, frame, out)
+
+                elif tag == DGM_MAP["VAR"]:
+                    name, typ = value_of(stmt)
+                    emit_expr(kid(stmt, 0), frame, out)
+                    slots[0] += 1
+                    frame[name] = f"dword [ebp-{4 + 4 * slots[0]}]"
+                    out.append(f"    mov {frame[name]}, eax")
+
+                elif tag == DGM_MAP["FLOW"] and value_of(stmt) == "print":
+                    emit_expr(kid(stmt, 0), frame, out)
+                    out.append("    push eax")
+                    out.append("    call print_int")
+                    out.append("    add esp, 4")
+
+                elif tag == DGM_MAP["RETURN"]:
+                    emit_expr(kid(stmt, 0), frame, out)
+                    out.extend(epilogue)
+
+                elif tag == DGM_MAP["PROOF"]:
+                    emit_expr(kid(stmt, 0), frame, out)
+                    held = label("proof")
+                    out.append("    test eax, eax")
+                    out.append(f"    jnz {held}")
+                    out.append("    call proof_failed")
+                    out.append(f"{held}:")
+                    emit_stmts(kids(kid(stmt, 1)))
+
+        emit_stmts(stmts)
+        out[4] = f"    sub esp, {4 * slots[0]}"
+        out.append("    xor eax, eax")
+        out.extend(epilogue)
+        functions.append(out)
+
+    emit_body("_main", kids(kid(root, 0)))
+    # _main first, then the functions in definition order
+    lines.extend(functions.pop())
+    for out in functions:
+        lines.extend(out)
+    return "\n".join(lines)
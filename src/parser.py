@@ -77,7 +77,7 @@ if __name__ == "__main__":
 def parse_expr(self):
     # supports VAR + VAR and VAR + NUMBER for now
     _, left = self.eat("ID")
-    if self.peek()[0] == "OP":  # e.g. +
+    if self.at("OP"):  # e.g. +
         op = self.eat("OP")[1]
         kind, right = self.peek()
         if kind == "ID":
@@ -104,7 +104,7 @@ def parse_print(self):
 def parse_expr(self):
     # supports VAR + VAR and VAR + NUMBER for now
     _, left = self.eat("ID")
-    if self.peek()[0] == "OP":  # e.g. +
+    if self.at("OP"):  # e.g. +
         op = self.eat("OP")[1]
         kind, right = self.peek()
         if kind == "ID":
@@ -131,7 +131,7 @@ def parse_print(self):
 def parse_expr(self):
     # Pratt/recursive descent (simple for now: left-assoc, same precedence)
     node = self.parse_term()
-    while self.peek()[0] == "OP" and self.peek()[1] in ["+", "-"]:
+    while self.at("OP") and self.peek()[1] in ["+", "-"]:
         op = self.eat("OP")[1]
         right = self.parse_term()
         node = ASTNode(DGM_MAP["EXPR"], op, [node, right])
@@ -139,7 +139,7 @@ def parse_expr(self):
 
 def parse_term(self):
     node = self.parse_factor()
-    while self.peek()[0] == "OP" and self.peek()[1] in ["*", "/"]:
+    while self.at("OP") and self.peek()[1] in ["*", "/"]:
         op = self.eat("OP")[1]
         right = self.parse_factor()
         node = ASTNode(DGM_MAP["EXPR"], op, [node, right])
@@ -170,7 +170,7 @@ def parse_if(self):
     cond = self.parse_expr()
     block = self.parse_block()
     else_block = None
-    if self.peek()[0] == "ELSE":
+    if self.at("ELSE"):
         self.eat("ELSE")
         else_block = self.parse_block()
     return ASTNode(DGM_MAP["IF"], None, [cond, block, else_block])
@@ -201,7 +201,7 @@ def parse_if(self):
     cond = self.parse_expr()
     block = self.parse_block()
     else_block = None
-    if self.peek()[0] == "ELSE":
+    if self.at("ELSE"):
         self.eat("ELSE")
         else_block = self.parse_block()
     return ASTNode(DGM_MAP["IF"], None, [cond, block, else_block])
@@ -335,7 +335,7 @@ def parse_func_def(self):
         params.append(pname)
     self.eat("SYMBOL")  # )
     block = self.parse_block()
-    return ASTNode(DGM_MAP["FUNC_DEF"], name, [ASTNode("params", params), block])
+    return ASTNode(DGM_MAP["FUNC_DEF"], name, [ASTNode(DGM_MAP["PARAMS"], params), block])
 
 def parse_func_call(self):
     _, name = self.eat("ID")
@@ -394,16 +394,16 @@ def parse_return(self):
 
 def parse_expr(self):
     node = self.parse_term()
-    while self.peek()[0] == "OP" or self.peek()[0] in ["AND", "OR"]:
-        if self.peek()[0] == "OP" and self.peek()[1] in ["+", "-", "<", ">", "<=", ">=", "==", "!="]:
+    while self.at("OP") or self.at("AND") or self.at("OR"):
+        if self.at("OP") and self.peek()[1] in ["+", "-", "<", ">", "<=", ">=", "==", "!="]:
             op = self.eat("OP")[1]
             right = self.parse_term()
             node = ASTNode(DGM_MAP["EXPR"], op, [node, right])
-        elif self.peek()[0] == "AND":
+        elif self.at("AND"):
             self.eat("AND")
             right = self.parse_term()
             node = ASTNode(DGM_MAP["EXPR"], "and", [node, right])
-        elif self.peek()[0] == "OR":
+        elif self.at("OR"):
             self.eat("OR")
             right = self.parse_term()
             node = ASTNode(DGM_MAP["EXPR"], "or", [node, right])
@@ -589,10 +589,10 @@ def parse_switch(self):
     self.eat("SYMBOL")  # {
     cases = []
     default_block = None
-    while self.peek()[0] != "SYMBOL" or self.peek()[1] != "}":
-        if self.peek()[0] == "CASE":
+    while not self.at("SYMBOL") or self.peek()[1] != "}":
+        if self.at("CASE"):
             cases.append(self.parse_case())
-        elif self.peek()[0] == "DEFAULT":
+        elif self.at("DEFAULT"):
             default_block = self.parse_default()
         else:
             raise SyntaxError(f"Unexpected in switch: {self.peek()}")
@@ -617,9 +617,9 @@ def parse_switch(self):
     cases = []
     default_block = None
     while self.peek()[1] != "}":
-        if self.peek()[0] == "CASE":
+        if self.at("CASE"):
             cases.append(self.parse_case())
-        elif self.peek()[0] == "DEFAULT":
+        elif self.at("DEFAULT"):
             default_block = self.parse_default()
         else:
             raise SyntaxError(f"Unexpected in switch: {self.peek()}")
@@ -644,7 +644,7 @@ def parse_pattern(self):
         self.eat("SYMBOL")
         return ASTNode(DGM_MAP["PATTERN"], "tuple", elems)
     # range pattern: 1 .. 5
-    elif self.peek()[0] == "NUMBER":
+    elif self.at("NUMBER"):
         _, start = self.eat("NUMBER")
         if self.peek()[1] == "..":
             self.eat("OP")
@@ -652,11 +652,11 @@ def parse_pattern(self):
             return ASTNode(DGM_MAP["PATTERN"], "range", [ASTNode(DGM_MAP["VALUE"], start), ASTNode(DGM_MAP["VALUE"], end)])
         return ASTNode(DGM_MAP["VALUE"], start)
     # wildcard
-    elif self.peek()[0] == "UNDERSCORE":
+    elif self.at("UNDERSCORE"):
         self.eat("UNDERSCORE")
         return ASTNode(DGM_MAP["PATTERN"], "wildcard")
     # identifier
-    elif self.peek()[0] == "ID":
+    elif self.at("ID"):
         _, name = self.eat("ID")
         return ASTNode(DGM_MAP["PATTERN"], name)
     else:
@@ -668,9 +668,9 @@ def parse_struct(self):
     self.eat("SYMBOL")  # {
     fields, methods = [], []
     while self.peek()[1] != "}":
-        if self.peek()[0] == "LET":
+        if self.at("LET"):
             fields.append(self.parse_let())
-        elif self.peek()[0] == "FLOW":
+        elif self.at("FLOW"):
             methods.append(self.parse_method_def(name))
     self.eat("SYMBOL")
     return ASTNode(DGM_MAP["STRUCT"], name, fields + methods)
@@ -687,7 +687,7 @@ def parse_method_def(self, struct_name):
         params.append(pname)
     self.eat("SYMBOL")  # )
     block = self.parse_block()
-    return ASTNode(DGM_MAP["METHOD_DEF"], (struct_name, mname), [ASTNode("params", params), block])
+    return ASTNode(DGM_MAP["METHOD_DEF"], (struct_name, mname), [ASTNode(DGM_MAP["PARAMS"], params), block])
 
 def parse_method_call(self, base):
     self.eat("SYMBOL")  # .
@@ -712,7 +712,7 @@ def parse_pattern(self):
         self.eat("SYMBOL")
         return ASTNode(DGM_MAP["PATTERN"], "tuple", elems)
 
-    elif self.peek()[0] == "ID":
+    elif self.at("ID"):
         # could be struct pattern
         _, name = self.eat("ID")
         if self.peek()[1] == "(":
@@ -726,11 +726,11 @@ def parse_pattern(self):
             return ASTNode(DGM_MAP["PATTERN"], ("struct", name), fields)
         return ASTNode(DGM_MAP["PATTERN"], name)
 
-    elif self.peek()[0] == "NUMBER":
+    elif self.at("NUMBER"):
         _, num = self.eat("NUMBER")
         return ASTNode(DGM_MAP["VALUE"], num)
 
-    elif self.peek()[0] == "UNDERSCORE":
+    elif self.at("UNDERSCORE"):
         self.eat("UNDERSCORE")
         return ASTNode(DGM_MAP["PATTERN"], "wildcard")
 
@@ -777,7 +777,7 @@ def parse_let(self):
         self.eat("OP")  # =
         expr = self.parse_expr()
         return ASTNode(DGM_MAP["DESTRUCT"], names, [expr])
-    elif self.peek()[0] == "ID":
+    elif self.at("ID"):
         _, name = self.eat("ID")
         if self.peek()[1] == "(":
             # struct destructure like Person(name, age)
@@ -794,7 +794,7 @@ def parse_let(self):
             expr = self.parse_expr()
             return ASTNode(DGM_MAP["DESTRUCT"], (struct_name, fields), [expr])
         else:
-            _, typ = self.eat("ID") if self.peek()[0] == "ID" else (None, None)
+            _, typ = self.eat("ID") if self.at("ID") else (None, None)
             self.eat("OP")
             expr = self.parse_expr()
             return ASTNode(DGM_MAP["VAR"], (name, typ), [expr])
@@ -803,8 +803,8 @@ def parse_trait(self):
     self.eat("TRAIT")
     _, tname = self.eat("ID")
     parent = None
-    if self.peek()[0] == "EXTENDS":
-        self.eat("EXTENDS")
+    if self.peek()[1] == "extends":
+        self.eat("ID")
         _, parent = self.eat("ID")
     self.eat("SYMBOL")  # {
     methods = []
@@ -818,16 +818,16 @@ def parse_trait(self):
     return ASTNode(DGM_MAP["TRAIT_DEF"], (tname, parent), methods)
 
 def parse_pattern(self):
-    if self.peek()[0] == "ID":
+    if self.at("ID"):
         _, name = self.eat("ID")
         if self.peek()[1] == "(":
             self.eat("SYMBOL")
             fields = []
             while self.peek()[1] != ")":
-                if self.peek()[0] == "ID":
+                if self.at("ID"):
                     _, fname = self.eat("ID")
                     fields.append(ASTNode(DGM_MAP["PATTERN"], fname))
-                elif self.peek()[0] == "UNDERSCORE":
+                elif self.at("UNDERSCORE"):
                     self.eat("UNDERSCORE")
                     fields.append(ASTNode(DGM_MAP["PATTERN"], "wildcard"))
                 else:
@@ -853,8 +853,8 @@ def parse_trait(self):
                 self.eat("SYMBOL")
         self.eat("SYMBOL")
     parent = None
-    if self.peek()[0] == "EXTENDS":
-        self.eat("EXTENDS")
+    if self.peek()[1] == "extends":
+        self.eat("ID")
         _, parent = self.eat("ID")
     self.eat("SYMBOL")  # {
     methods = []
@@ -945,12 +945,12 @@ def parse_do(self):
     binds = []
     ret_expr = None
     while self.peek()[1] != "}":
-        if self.peek()[0] == "ID" and self.lookahead()[1] == "<-":
+        if self.at("ID") and self.lookahead()[1] == "<-":
             _, var = self.eat("ID")
             self.eat("OP")  # <-
             expr = self.parse_expr()
             binds.append(ASTNode(DGM_MAP["MONAD_BIND"], var, [expr]))
-        elif self.peek()[0] == "RETURN":
+        elif self.at("RETURN"):
             self.eat("RETURN")
             ret_expr = self.parse_expr()
         else:
@@ -964,12 +964,12 @@ def parse_for(self):
     binds = []
     yield_expr = None
     while self.peek()[1] != "}":
-        if self.peek()[0] == "ID" and self.lookahead()[1] == "<-":
+        if self.at("ID") and self.lookahead()[1] == "<-":
             _, var = self.eat("ID")
             self.eat("OP")
             expr = self.parse_expr()
             binds.append(ASTNode(DGM_MAP["MONAD_BIND"], var, [expr]))
-        elif self.peek()[0] == "YIELD":
+        elif self.at("YIELD"):
             self.eat("YIELD")
             yield_expr = self.parse_expr()
         else:
@@ -984,17 +984,17 @@ def parse_list_comprehension(self):
     binds = []
     cond = None
     while self.peek()[1] != "]":
-        if self.peek()[0] == "ID" and self.lookahead()[1] == "<-":
+        if self.at("ID") and self.lookahead()[1] == "<-":
             _, var = self.eat("ID")
             self.eat("OP")  # <-
             source = self.parse_expr()
             binds.append(ASTNode(DGM_MAP["MONAD_BIND"], var, [source]))
-        elif self.peek()[0] == "ID" or self.peek()[0] == "NUMBER":
+        elif self.at("ID") or self.at("NUMBER"):
             cond = self.parse_expr()
         if self.peek()[1] == ",":
             self.eat("SYMBOL")
     self.eat("SYMBOL")  # ]
-    return ASTNode("LIST_COMPREHENSION", None, [expr] + binds + ([cond] if cond else []))
+    return ASTNode(DGM_MAP["LIST_COMPREHENSION"], None, [expr] + binds + ([cond] if cond else []))
 
 def parse_effect(self):
     self.eat("EFFECT")
@@ -1042,7 +1042,7 @@ def parse_handler(self):
         block = self.parse_block()
         cases.append(ASTNode(DGM_MAP["HANDLER_CASE"], (opname, params), block.children))
     self.eat("SYMBOL")
-    self.eat("RUN")
+    self.eat_word("run")
     run_block = self.parse_block()
     return ASTNode(DGM_MAP["HANDLER_DEF"], ename, cases + run_block.children)
 
@@ -1056,3 +1056,612 @@ def parse_parallel(self):
     block = self.parse_block()
     return ASTNode(DGM_MAP["PARALLEL_BLOCK"], None, block.children)
 
+# parser.py — data-parallel for
+
+def parse_parallel(self):
+    self.eat("PARALLEL")
+    if self.at("FOR"):
+        return self.parse_parallel_for()
+    block = self.parse_block()
+    return ASTNode(DGM_MAP["PARALLEL_BLOCK"], None, block.children)
+
+def parse_parallel_for(self):
+    # parallel for i in 0 .. n [chunk 512] [reduce +] { ... }
+    self.eat("FOR")
+    _, var = self.eat("ID")
+    self.eat("IN")
+    start = self.parse_expr()
+    self.eat("OP")  # ..
+    end = self.parse_expr()
+    chunk, reducer = None, None
+    while self.at("ID") and self.peek()[1] in ("chunk", "reduce"):
+        _, word = self.eat("ID")
+        if word == "chunk":
+            chunk = self.parse_expr()
+        else:
+            _, reducer = self.eat()  # + * min max
+    where = self.where()
+    block = self.parse_block()
+    if loose_break(block):
+        raise SyntaxError("`break` cannot leave a parallel for" + where)
+    return ASTNode(DGM_MAP["PARALLEL_FOR"], (var, reducer), [start, end, block, chunk])
+
+# a `break` inside these belongs to them, not to an enclosing parallel for
+BREAK_SCOPES = frozenset(DGM_MAP[t] for t in ("FOR", "WHILE", "PARALLEL_FOR", "FUNC_DEF"))
+
+def loose_break(block):
+    # chunks run independently, so there are no "remaining iterations" to skip;
+    # `continue` stays allowed, it only ends its own index
+    stack = list(block.children)
+    while stack:
+        n = stack.pop()
+        if not isinstance(n, ASTNode) or n.tag in BREAK_SCOPES:
+            continue
+        if n.tag == DGM_MAP["BREAK"]:
+            return True
+        if isinstance(n.value, ASTNode):
+            stack.append(n.value)
+        stack.extend(n.children)
+    return False
+
+
+# parser.py — do/for bind chains
+
+def parse_bind_chain(self, tag, terminal_kw, terminal_tag, trailing=False):
+    # desugared once: binds in order, then exactly one terminal step.
+    # VESE walks the chain by position instead of re-slicing the block per bind.
+    # trailing: the terminal may also follow the closing brace, `for { ... } yield e`
+    self.eat("SYMBOL")  # {
+    steps = []
+    terminal = None
+    while self.peek()[1] != "}":
+        if self.at("ID") and self.lookahead()[1] == "<-":
+            _, var = self.eat("ID")
+            self.eat("OP")  # <-
+            steps.append(ASTNode(DGM_MAP["MONAD_BIND"], var, [self.parse_expr()]))
+        elif self.at(terminal_kw) and terminal is None:
+            self.eat(terminal_kw)
+            terminal = ASTNode(DGM_MAP[terminal_tag], None, [self.parse_expr()])
+        else:
+            raise SyntaxError(f"Unexpected in {tag[:-6].lower()} block {self.peek()}")
+    self.eat("SYMBOL")
+    if trailing and terminal is None and self.at(terminal_kw):
+        self.eat(terminal_kw)
+        terminal = ASTNode(DGM_MAP[terminal_tag], None, [self.parse_expr()])
+    # no terminal: the chain yields whatever the last bind produced
+    steps.append(terminal or ASTNode(DGM_MAP[terminal_tag], None, []))
+    return ASTNode(DGM_MAP[tag], None, steps)
+
+def parse_do(self):
+    self.eat("DO")
+    return self.parse_bind_chain("DO_BLOCK", "RETURN", "RETURN")
+
+def parse_for(self):
+    self.eat("FOR")
+    return self.parse_bind_chain("FOR_BLOCK", "YIELD", "MONAD_YIELD", trailing=True)
+
+# parser.py — streaming token input
+
+from lexer import TokenStream
+
+class Parser(Parser):
+    # tokens may be a list or any iterator (lexer.tokenize_file);
+    # either way they are only reached through a small lookahead window
+    def __init__(self, tokens):
+        self.tokens = tokens if isinstance(tokens, TokenStream) else TokenStream(tokens)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens.get(self.pos)
+
+    def lookahead(self, n=1):
+        return self.tokens.get(self.pos + n)
+
+    def eat(self, kind=None):
+        tok = self.peek()
+        if kind and tok[0] != kind:
+            raise SyntaxError(f"Expected {kind}, got {tok}")
+        self.pos += 1
+        self.tokens.release(self.pos)
+        return tok
+
+# parser.py — integer kind checks and token spans
+
+from lexer import KIND_IDS, TokenBuffer
+
+class Parser(Parser):
+    def __init__(self, tokens):
+        # a TokenBuffer is indexed in place; lists and iterators go through a TokenStream
+        self.tokens = tokens if isinstance(tokens, (TokenBuffer, TokenStream)) else TokenStream(tokens)
+        self.pos = 0
+        self.peeked_at, self.peeked = -1, None   # peek() builds one token per position
+
+    def eat(self, kind=None):
+        if kind and self.tokens.kind_at(self.pos) != KIND_IDS.get(kind):
+            raise SyntaxError(f"Expected {kind}, got {self.peek()}" + self.where())
+        tok = self.peek()
+        self.pos += 1
+        self.tokens.release(self.pos)
+        return tok
+
+    def at(self, kind, n=0):
+        # integer compare against the buffered kind; no token is built
+        return self.tokens.kind_at(self.pos + n) == KIND_IDS.get(kind)
+
+    def span(self):
+        return self.tokens.span(self.pos)
+
+    def where(self):
+        loc = self.tokens.location(self.pos)
+        return f" at line {loc[0]}, column {loc[1]}" if loc else ""
+
+# parser.py — precedence-climbing expressions
+
+# token value → (left binding power, right binding power); equal powers associate to the right
+BINARY_OPS = {
+    "|": (1, 2),
+    "<-": (3, 3),
+    ">>=": (5, 6),
+    "or": (7, 8),
+    "and": (9, 10),
+    "==": (11, 12), "!=": (11, 12),
+    "<": (11, 12), "<=": (11, 12), ">": (11, 12), ">=": (11, 12),
+    "+": (13, 14), "-": (13, 14),
+    "*": (15, 16), "/": (15, 16),
+    "^": (19, 19),
+}
+
+# token value → binding power of the operand
+PREFIX_OPS = {"not": 17, "-": 17}
+
+# kinds whose value may name an operator
+OPERATOR_KINDS = frozenset(KIND_IDS[k] for k in ("OP", "SYMBOL", "AND", "OR", "NOT"))
+
+def operator_at(self, table):
+    # the operator at the current token if `table` has it; reads the value only
+    # for tokens whose kind can spell one
+    if self.tokens.kind_at(self.pos) in OPERATOR_KINDS:
+        val = self.peek()[1]
+        if val in table:
+            return val
+    return None
+
+def reduce_expr(operands, op, prefix):
+    right = operands.pop()
+    if not prefix:
+        operands[-1] = ASTNode(DGM_MAP["EXPR"], op, [operands[-1], right])
+    elif op == "-":
+        # lowered so every backend handles negation without a unary case
+        operands.append(ASTNode(DGM_MAP["EXPR"], "-", [ASTNode(DGM_MAP["VALUE"], 0), right]))
+    else:
+        operands.append(ASTNode(DGM_MAP["EXPR"], op, [right]))
+
+def parse_expr(self, min_bp=0):
+    # operator-precedence loop over explicit stacks: operator chains of any length
+    # use no recursion, only parentheses and call arguments nest Python frames
+    operands, pending = [], []   # pending: (right binding power, op, prefix?)
+    while True:
+        op = self.operator_at(PREFIX_OPS)
+        while op is not None:
+            self.eat()
+            pending.append((PREFIX_OPS[op], op, True))
+            op = self.operator_at(PREFIX_OPS)
+        operands.append(self.parse_primary())
+
+        op = self.operator_at(BINARY_OPS)
+        if op is None or BINARY_OPS[op][0] < min_bp:
+            break
+        left_bp, right_bp = BINARY_OPS[op]
+        while pending and pending[-1][0] > left_bp:
+            _, top, prefix = pending.pop()
+            reduce_expr(operands, top, prefix)
+        self.eat()
+        pending.append((right_bp, op, False))
+    while pending:
+        _, top, prefix = pending.pop()
+        reduce_expr(operands, top, prefix)
+    return operands[0]
+
+def parse_primary(self):
+    kind = self.tokens.kind_at(self.pos)
+    if kind == KIND_IDS["SYMBOL"] and self.peek()[1] == "(":
+        self.eat("SYMBOL")
+        expr = self.parse_expr()
+        self.eat("SYMBOL")  # )
+        return expr
+    elif kind == KIND_IDS["STRING"]:
+        return ASTNode(DGM_MAP["VALUE"], self.eat("STRING")[1])
+    elif kind == KIND_IDS["NUMBER"]:
+        return ASTNode(DGM_MAP["VALUE"], self.eat("NUMBER")[1])
+    elif kind == KIND_IDS["ID"]:
+        if self.tokens.kind_at(self.pos + 1) not in NOT_AWAITED and self.peek()[1] == "await":
+            # `await t` / `await async { ... }`: a contextual word, so `await(t)` stays a call
+            self.eat("ID")
+            return ASTNode(DGM_MAP["EFFECT_INVOKE"], "await", [self.parse_primary()])
+        if self.tokens.kind_at(self.pos + 1) != KIND_IDS["SYMBOL"]:
+            return ASTNode(DGM_MAP["VAR"], self.eat("ID")[1])   # a plain name: nothing postfix follows
+        nxt = self.lookahead()[1]
+        if nxt == "(":
+            return self.parse_func_call()
+        if nxt == ".":
+            # name.method(...) or name.field
+            if self.lookahead(3)[1] == "(":
+                return self.parse_method_call(self.eat("ID")[1])
+            base = self.eat("ID")[1]
+            self.eat("SYMBOL")  # .
+            return ASTNode(DGM_MAP["FIELD"], (base, self.eat("ID")[1]))
+    elif kind == KIND_IDS["SYMBOL"] and self.peek()[1] == "[":
+        return self.parse_list_comprehension()
+    elif kind in EXPR_STARTERS:
+        return getattr(self, EXPR_STARTERS[kind])()
+    return self.parse_factor()
+
+# kind id → method for keyword-led constructs that also read as expressions
+EXPR_STARTERS = {KIND_IDS["LIST"]: "parse_list", KIND_IDS["ARRAY"]: "parse_array",
+                 KIND_IDS["TUPLE"]: "parse_tuple",
+                 KIND_IDS["DO"]: "parse_do", KIND_IDS["FOR"]: "parse_for",
+                 KIND_IDS["PARALLEL"]: "parse_parallel", KIND_IDS["ASYNC"]: "parse_async"}
+
+# kinds after `await` that leave it a plain name: await(...), await.x, await = ..., the end (0)
+NOT_AWAITED = frozenset((KIND_IDS["SYMBOL"], KIND_IDS["OP"], 0))
+
+def parse_list_comprehension(self):
+    self.eat("SYMBOL")  # [
+    expr = self.parse_expr(BINARY_OPS["|"][1])   # the head stops at the first |
+    self.eat("OP")  # |
+    binds = []
+    cond = None
+    while self.peek()[1] != "]":
+        if self.at("ID") and self.lookahead()[1] == "<-":
+            _, var = self.eat("ID")
+            self.eat("OP")  # <-
+            source = self.parse_expr()
+            binds.append(ASTNode(DGM_MAP["MONAD_BIND"], var, [source]))
+        else:
+            cond = self.parse_expr()   # any guard expression, not only ones starting with a name
+        if self.peek()[1] == ",":
+            self.eat("SYMBOL")
+    self.eat("SYMBOL")  # ]
+    return ASTNode(DGM_MAP["LIST_COMPREHENSION"], None, [expr] + binds + ([cond] if cond else []))
+
+# parser.py — statement dispatch table
+
+from lexer import KIND_NAMES
+
+# token kind → method that parses a statement starting with it
+STMT_STARTERS = {
+    "LET": "parse_let", "PRINT": "parse_print", "RETURN": "parse_return",
+    "IF": "parse_if", "FOR": "parse_for", "WHILE": "parse_while", "NEST": "parse_nest",
+    "BREAK": "parse_break", "CONTINUE": "parse_continue",
+    "SWITCH": "parse_switch", "CASE": "parse_case", "DEFAULT": "parse_default",
+    "FLOW": "parse_func_def", "STRUCT": "parse_struct", "TRAIT": "parse_trait",
+    "IMPL": "parse_impl", "ENUM": "parse_enum",
+    "TUPLE": "parse_tuple", "LIST": "parse_list", "ARRAY": "parse_array", "PROOF": "parse_proof",
+    "EFFECT": "parse_effect", "HANDLE": "parse_handler", "ASYNC": "parse_async",
+    "PARALLEL": "parse_parallel", "DO": "parse_do",
+    "ID": "parse_id_stmt",
+}
+
+# indexed by kind id: one list lookup per statement, however many starters there are
+STMT_TABLE = [STMT_STARTERS.get(name) for name in KIND_NAMES]
+
+class Parser(Parser):
+    # the newest module-level version of each fragment above becomes a method here
+    operator_at = operator_at
+    parse_expr = parse_expr
+    parse_primary = parse_primary
+    parse_factor = parse_factor
+    parse_list_comprehension = parse_list_comprehension
+    parse_print = parse_print
+    parse_return = parse_return
+    parse_if = parse_if
+    parse_while = parse_while
+    parse_nest = parse_nest
+    parse_switch = parse_switch
+    parse_default = parse_default
+    parse_func_def = parse_func_def
+    parse_func_call = parse_func_call
+    parse_struct = parse_struct
+    parse_method_def = parse_method_def
+    parse_method_call = parse_method_call
+    parse_trait = parse_trait
+    parse_impl = parse_impl
+    parse_enum = parse_enum
+    parse_tuple = parse_tuple
+    parse_list = parse_list
+    parse_array = parse_array
+    parse_proof = parse_proof
+    parse_effect = parse_effect
+    parse_effect_invoke = parse_effect_invoke
+    parse_handler = parse_handler
+    parse_async = parse_async
+    parse_parallel = parse_parallel
+    parse_parallel_for = parse_parallel_for
+    parse_bind_chain = parse_bind_chain
+    parse_do = parse_do
+
+    def peek(self, n=0):
+        # the token n places ahead, (None, None) past the end; lists, iterators
+        # and TokenBuffers all answer through the same get(). Kind checks go
+        # through at(); a value read and the eat() after it share one token
+        i = self.pos + n
+        if i != self.peeked_at:
+            self.peeked_at, self.peeked = i, self.tokens.get(i)
+        return self.peeked
+
+    def lookahead(self, n=1):
+        return self.peek(n)
+
+    def peek_kind(self, n=0):
+        return self.tokens.kind_at(self.pos + n)
+
+    def eat_word(self, word):
+        # contextual words (`run`, `extends`) stay IDs so programs can still call .run()
+        tok = self.peek()
+        if tok[1] != word:
+            raise SyntaxError(f"Expected {word!r}, got {tok}" + self.where())
+        return self.eat()
+
+    def parse_stmt(self):
+        method = STMT_TABLE[self.peek_kind()]
+        if method is None:
+            raise SyntaxError(f"Unknown stmt {self.peek()[0]}" + self.where())
+        return getattr(self, method)()
+
+    def parse_let(self):
+        # let name: Type = expr; the other let forms are the fragment's
+        if not self.at("ID", 1) or self.peek(2)[1] != ":":
+            return parse_let(self)
+        self.eat("LET")
+        _, name = self.eat("ID")
+        self.eat("SYMBOL")  # :
+        typ = self.parse_type_name()
+        self.eat("OP")  # =
+        return ASTNode(DGM_MAP["VAR"], (name, typ), [self.parse_expr()])
+
+    def parse_type_name(self):
+        # Option<List<int>> → "Option<List<int>>", kept as one spelling
+        _, name = self.eat("ID")
+        if self.peek()[1] != "<":
+            return name
+        self.eat("SYMBOL")
+        args = [self.parse_type_name()]
+        while self.peek()[1] == ",":
+            self.eat("SYMBOL")
+            args.append(self.parse_type_name())
+        self.eat("SYMBOL")  # >
+        return f"{name}<{', '.join(args)}>"
+
+    def parse_for(self):
+        # one token decides: `for {` is a bind chain, `for i in a .. b {` a loop
+        if self.peek(1)[1] == "{":
+            return parse_for(self)
+        self.eat("FOR")
+        _, var = self.eat("ID")
+        self.eat("IN")
+        start = self.parse_expr()
+        self.eat("OP")  # ..
+        end = self.parse_expr()
+        block = self.parse_block()
+        return ASTNode(DGM_MAP["FOR"], var, [start, end, block])
+
+    def parse_case(self):
+        # the case fragment newest on the module is the pattern form
+        self.eat("CASE")
+        pattern = self.parse_pattern()
+        block = self.parse_block()
+        return ASTNode(DGM_MAP["CASE"], None, [pattern, block])
+
+    def parse_pattern(self):
+        # Name(field, _, nested) | Name | number | (a, b) | _
+        kind, val = self.peek()
+        if kind == "ID" and val != "_":
+            _, name = self.eat("ID")
+            if self.peek()[1] != "(":
+                return ASTNode(DGM_MAP["PATTERN"], name)
+            return ASTNode(DGM_MAP["PATTERN"], ("struct", name), self.parse_pattern_list())
+        if val == "(":
+            return ASTNode(DGM_MAP["PATTERN"], "tuple", self.parse_pattern_list())
+        if kind == "NUMBER":
+            return ASTNode(DGM_MAP["VALUE"], self.eat("NUMBER")[1])
+        if val == "_":
+            self.eat("ID")
+            return ASTNode(DGM_MAP["PATTERN"], "wildcard")
+        raise SyntaxError(f"Unexpected pattern {self.peek()}" + self.where())
+
+    def parse_pattern_list(self):
+        self.eat("SYMBOL")  # (
+        elems = []
+        while self.peek()[1] != ")":
+            elems.append(self.parse_pattern())
+            if self.peek()[1] == ",":
+                self.eat("SYMBOL")
+        self.eat("SYMBOL")
+        return elems
+
+    def parse_id_stmt(self):
+        # name = expr | name[i] = expr | name.field = expr | name.method(...) | name(...) | await t
+        nxt = self.peek(1)[1]
+        if self.peek()[1] == "await" and self.peek_kind(1) not in NOT_AWAITED:
+            return self.parse_expr()
+        if nxt == "(":
+            return self.parse_func_call()
+        if nxt == "=":
+            name = self.eat("ID")[1]
+            self.eat("OP")
+            return ASTNode(DGM_MAP["ASSIGN"], name, [self.parse_expr()])
+        if nxt == "[":
+            name = self.eat("ID")[1]
+            indices = []
+            while self.peek()[1] == "[":
+                self.eat("SYMBOL")  # [
+                indices.append(self.parse_expr())
+                self.eat("SYMBOL")  # ]
+            self.eat("OP")      # =
+            # name[i][j] = expr: the whole path under one ITEM node, never an INDEX chain
+            index = indices[0] if len(indices) == 1 else ASTNode(DGM_MAP["ITEM"], "path", indices)
+            return ASTNode(DGM_MAP["ASSIGN"], name, [index, self.parse_expr()])
+        if nxt == "." and self.peek(3)[1] == "(":
+            return self.parse_method_call(self.eat("ID")[1])
+        if nxt == ".":
+            base = self.eat("ID")[1]
+            self.eat("SYMBOL")  # .
+            field = self.eat("ID")[1]
+            self.eat("OP")      # =
+            return ASTNode(DGM_MAP["FIELD_ASSIGN"], (base, field), [self.parse_expr()])
+        raise SyntaxError(f"Unknown stmt starting with {self.peek()[1]!r}" + self.where())
+
+    def parse_break(self):
+        self.eat("BREAK")
+        return ASTNode(DGM_MAP["BREAK"], None)
+
+    def parse_continue(self):
+        self.eat("CONTINUE")
+        return ASTNode(DGM_MAP["CONTINUE"], None)
+
+# parser.py — parallel top-level items
+
+import atexit, gc, os, re
+from concurrent.futures import ProcessPoolExecutor
+from ast_dgm import dumps, loads
+from contextlib import contextmanager
+from itertools import repeat
+
+PARSE_WORKERS = os.cpu_count() or 1
+PARALLEL_PARSE_MIN_TOKENS = 50000   # smaller programs parse faster than a pool starts
+PARSE_CHUNK_MIN_TOKENS = 4000       # items are batched so each task outweighs its pickling
+
+# statements that own a braced body and never continue past its closing brace
+ITEM_KINDS = ("FLOW", "STRUCT", "ENUM", "TRAIT", "IMPL")
+ITEM_OR_SYMBOL = re.compile(b"[" + re.escape(bytes(KIND_IDS[k] for k in ITEM_KINDS + ("SYMBOL",))) + b"]")
+
+_parse_pool = None
+
+def get_parse_pool():
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+        atexit.register(_parse_pool.shutdown)
+    return _parse_pool
+
+@contextmanager
+def gc_paused():
+    # a parse allocates many objects and no cycles: collections triggered along
+    # the way (or while decoding a worker's subtrees) find nothing to free
+    was = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was:
+            gc.enable()
+
+def item_boundaries(buf, open_):
+    # token indices inside the block opened at `open_` where a statement is known
+    # to start (before and after every top-level item), and the block's closing brace.
+    # Only SYMBOL and item-keyword tokens are visited; the kind bytes are searched in C.
+    kinds, starts, src = buf.kinds.tobytes(), buf.starts, buf.source
+    symbol = KIND_IDS["SYMBOL"]
+    if src[starts[open_]:starts[open_] + 1] not in ("{", b"{"):
+        raise SyntaxError("Expected { after the program name")
+    cuts, depth, in_item = [open_ + 1], 0, False
+    for mo in ITEM_OR_SYMBOL.finditer(kinds, open_):
+        i = mo.start()
+        if kinds[i] != symbol:
+            if depth == 1 and not in_item:
+                if i != cuts[-1]:
+                    cuts.append(i)
+                in_item = True
+            continue
+        ch = src[starts[i]:starts[i] + 1]
+        if ch in ("{", b"{"):
+            depth += 1
+        elif ch in ("}", b"}"):
+            depth -= 1
+            if depth == 0:
+                return cuts, i
+            if depth == 1 and in_item:
+                cuts.append(i + 1)
+                in_item = False
+    raise SyntaxError("Unbalanced braces in program body")
+
+def chunk_ranges(cuts, close, size):
+    # consecutive items merged until each range holds at least `size` tokens
+    ranges, start = [], cuts[0]
+    for cut in cuts[1:]:
+        if cut - start >= size:
+            ranges.append((start, cut))
+            start = cut
+    if close > start:
+        ranges.append((start, close))
+    return ranges
+
+def parse_token_range(parser_class, tokens):
+    # runs in a pool worker: every statement of a self-contained token slice,
+    # sent back in the binary DGM format
+    p = parser_class(tokens)
+    stmts = []
+    with gc_paused():
+        while p.pos < len(tokens):
+            stmts.append(p.parse_stmt())
+    return dumps(ASTNode(DGM_MAP["BLOCK"], None, stmts))
+
+class Parser(Parser):
+    parallel = True
+
+    def parallel_parts(self):
+        # (program name, dumps() of each chunk's statements), or None to parse sequentially
+        tokens = self.tokens
+        if not (self.parallel and PARSE_WORKERS > 1 and isinstance(tokens, TokenBuffer)
+                and len(tokens) - self.pos >= PARALLEL_PARSE_MIN_TOKENS):
+            return None
+        start = self.pos
+        self.eat("INIT")
+        _, name = self.eat("ID")
+        try:
+            cuts, close = item_boundaries(tokens, self.pos)
+            size = max(PARSE_CHUNK_MIN_TOKENS, (close - self.pos) // (PARSE_WORKERS * 4))
+            slices = [tokens.slice(a, b) for a, b in chunk_ranges(cuts, close, size)]
+            parts = list(get_parse_pool().map(parse_token_range, repeat(type(self)), slices))
+        except Exception:
+            # any failure, including a broken pool: the sequential parse reports
+            # syntax errors at their real positions
+            self.pos = start
+            return None
+        self.pos = close + 1
+        return name, parts
+
+    def parse_program(self):
+        found = self.parallel_parts()
+        if found is None:
+            return super().parse_program()
+        name, parts = found
+        with gc_paused():
+            stmts = [stmt for part in parts for stmt in loads(part).children]
+        return ASTNode(DGM_MAP["PROGRAM"], name, [ASTNode(DGM_MAP["BLOCK"], None, stmts)])
+
+# parser.py — frozen trees
+
+from ast_dgm import freeze
+
+class Parser(Parser):
+    def parse(self):
+        # statements are built into lists; the finished tree holds tuples
+        return freeze(super().parse())
+
+# parser.py — arena output
+
+from ast_dgm import Arena
+
+class Parser(Parser):
+    def parse_arena(self):
+        """Parse into an Arena; chunks parsed in parallel go into it without making nodes."""
+        found = self.parallel_parts()
+        if found is None:
+            return Arena.from_tree(self.parse())
+        name, parts = found
+        arena = Arena()
+        block = arena.add(DGM_MAP["BLOCK"], None, arena.add(DGM_MAP["PROGRAM"], name))
+        for part in parts:
+            arena.append_dgm(part, block, skip_root=True)
+        return arena
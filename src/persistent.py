@@ -0,0 +1,329 @@
+# persistent.py — Rinse v0.1.0
+# Persistent collections for VESE values: updates return a new version that
+# shares all untouched structure with the old one, so values handed to other
+# tasks never need a copy or a lock.
+
+BITS = 5
+WIDTH = 1 << BITS   # 32-way branching
+MASK = WIDTH - 1
+
+# ===================================================
+# PVector: 32-way trie with a tail buffer
+# ===================================================
+
+class PVector:
+    __slots__ = ("count", "shift", "root", "tail")
+
+    def __init__(self, count=0, shift=BITS, root=(), tail=()):
+        self.count = count
+        self.shift = shift
+        self.root = root    # nested tuples; leaves hold WIDTH values
+        self.tail = tail    # the last 1..WIDTH values, outside the trie
+
+    @classmethod
+    def from_iter(cls, items):
+        items = list(items)
+        if len(items) <= WIDTH:
+            return cls(len(items), BITS, (), tuple(items))
+        cut = (len(items) - 1) // WIDTH * WIDTH
+        level = [tuple(items[i:i + WIDTH]) for i in range(0, cut, WIDTH)]
+        shift = BITS
+        # build bottom-up: every level packs left, only the rightmost path is partial
+        while len(level) > WIDTH:
+            level = [tuple(level[i:i + WIDTH]) for i in range(0, len(level), WIDTH)]
+            shift += BITS
+        return cls(len(items), shift, tuple(level), tuple(items[cut:]))
+
+    def tail_offset(self):
+        return 0 if self.count <= WIDTH else (self.count - 1) // WIDTH * WIDTH
+
+    def leaf_for(self, i):
+        if i >= self.tail_offset():
+            return self.tail
+        node = self.root
+        for level in range(self.shift, 0, -BITS):
+            node = node[(i >> level) & MASK]
+        return node
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return PVector.from_iter(list(self)[i])
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("vector index out of range")
+        return self.leaf_for(i)[i & MASK]
+
+    def __iter__(self):
+        for start in range(0, self.count, WIDTH):
+            yield from self.leaf_for(start)
+
+    def set(self, i, value):
+        if i < 0:
+            i += self.count
+        if i == self.count:
+            return self.append(value)
+        if not 0 <= i < self.count:
+            raise IndexError("vector index out of range")
+        if i >= self.tail_offset():
+            tail = list(self.tail)
+            tail[i & MASK] = value
+            return PVector(self.count, self.shift, self.root, tuple(tail))
+        return PVector(self.count, self.shift, assoc_path(self.root, self.shift, i, value), self.tail)
+
+    def append(self, value):
+        if len(self.tail) < WIDTH:
+            return PVector(self.count + 1, self.shift, self.root, self.tail + (value,))
+        # tail is full: push it into the trie, growing a level when the root is full
+        if (self.count >> BITS) > (1 << self.shift):
+            root = (self.root, new_path(self.shift, self.tail))
+            return PVector(self.count + 1, self.shift + BITS, root, (value,))
+        root = push_tail(self.root, self.shift, self.count - 1, self.tail)
+        return PVector(self.count + 1, self.shift, root, (value,))
+
+    def extend(self, items):
+        v = self
+        for x in items:
+            v = v.append(x)
+        return v
+
+    def __add__(self, other):
+        return self.extend(other)
+
+    def __setitem__(self, i, value):
+        raise TypeError("PVector is immutable; use set()")
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, (PVector, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __reduce__(self):
+        return (PVector.from_iter, (list(self),))
+
+def assoc_path(node, level, i, value):
+    node = list(node)
+    if level == 0:
+        node[i & MASK] = value
+    else:
+        sub = (i >> level) & MASK
+        node[sub] = assoc_path(node[sub], level - BITS, i, value)
+    return tuple(node)
+
+def new_path(level, leaf):
+    return leaf if level == 0 else (new_path(level - BITS, leaf),)
+
+def push_tail(node, level, last, leaf):
+    sub = (last >> level) & MASK
+    if level == BITS:
+        return node + (leaf,)
+    if sub < len(node):
+        return node[:sub] + (push_tail(node[sub], level - BITS, last, leaf),) + node[sub + 1:]
+    return node + (new_path(level - BITS, leaf),)
+
+# ===================================================
+# PMap: hash array mapped trie
+# ===================================================
+
+# the key slot of a sub-trie entry: None is an ordinary key
+SUBTRIE = object()
+
+class BitmapNode:
+    # entries: key/value pairs stored inline, or (SUBTRIE, child) for a sub-trie
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap, entries):
+        self.bitmap = bitmap
+        self.entries = entries
+
+    def get(self, shift, h, key, default):
+        bit = 1 << ((h >> shift) & MASK)
+        if not self.bitmap & bit:
+            return default
+        k, v = self.entries[bin(self.bitmap & (bit - 1)).count("1")]
+        if k is SUBTRIE:
+            return v.get(shift + BITS, h, key, default)
+        return v if k == key else default
+
+    def assoc(self, shift, h, key, value):
+        # returns (node, added)
+        bit = 1 << ((h >> shift) & MASK)
+        idx = bin(self.bitmap & (bit - 1)).count("1")
+        if not self.bitmap & bit:
+            entries = self.entries[:idx] + ((key, value),) + self.entries[idx:]
+            return BitmapNode(self.bitmap | bit, entries), True
+        k, v = self.entries[idx]
+        if k is SUBTRIE:
+            child, added = v.assoc(shift + BITS, h, key, value)
+            entry = (SUBTRIE, child)
+        elif k == key:
+            if v is value:
+                return self, False
+            entry, added = (key, value), False
+        else:
+            entry, added = (SUBTRIE, split(shift + BITS, k, v, h, key, value)), True
+        return BitmapNode(self.bitmap, self.entries[:idx] + (entry,) + self.entries[idx + 1:]), added
+
+    def without(self, shift, h, key):
+        # returns (node or None when emptied, removed)
+        bit = 1 << ((h >> shift) & MASK)
+        if not self.bitmap & bit:
+            return self, False
+        idx = bin(self.bitmap & (bit - 1)).count("1")
+        k, v = self.entries[idx]
+        if k is SUBTRIE:
+            child, removed = v.without(shift + BITS, h, key)
+            if not removed:
+                return self, False
+            if child is not None:
+                return BitmapNode(self.bitmap, self.entries[:idx] + ((SUBTRIE, child),) + self.entries[idx + 1:]), True
+        elif k != key:
+            return self, False
+        if self.bitmap == bit:
+            return None, True
+        return BitmapNode(self.bitmap ^ bit, self.entries[:idx] + self.entries[idx + 1:]), True
+
+    def items(self):
+        for k, v in self.entries:
+            if k is SUBTRIE:
+                yield from v.items()
+            else:
+                yield k, v
+
+class CollisionNode:
+    # keys whose full hashes collide
+    __slots__ = ("hash", "entries")
+
+    def __init__(self, h, entries):
+        self.hash = h
+        self.entries = entries
+
+    def get(self, shift, h, key, default):
+        for k, v in self.entries:
+            if k == key:
+                return v
+        return default
+
+    def assoc(self, shift, h, key, value):
+        for i, (k, _) in enumerate(self.entries):
+            if k == key:
+                return CollisionNode(h, self.entries[:i] + ((key, value),) + self.entries[i + 1:]), False
+        return CollisionNode(h, self.entries + ((key, value),)), True
+
+    def without(self, shift, h, key):
+        entries = tuple(e for e in self.entries if e[0] != key)
+        if len(entries) == len(self.entries):
+            return self, False
+        return (CollisionNode(h, entries) if entries else None), True
+
+    def items(self):
+        yield from self.entries
+
+HASH_BITS = 64
+
+def split(shift, k1, v1, h2, k2, v2):
+    h1 = hash(k1) & ((1 << HASH_BITS) - 1)
+    if shift >= HASH_BITS or h1 == h2:
+        return CollisionNode(h1, ((k1, v1), (k2, v2)))
+    node, _ = BitmapNode(0, ()).assoc(shift, h1, k1, v1)
+    node, _ = node.assoc(shift, h2, k2, v2)
+    return node
+
+class PMap:
+    __slots__ = ("root", "count")
+
+    def __init__(self, root=None, count=0):
+        self.root = root
+        self.count = count
+
+    @classmethod
+    def from_items(cls, items):
+        m = cls()
+        for k, v in (items.items() if isinstance(items, dict) else items):
+            m = m.set(k, v)
+        return m
+
+    def get(self, key, default=None):
+        if self.root is None:
+            return default
+        return self.root.get(0, hash(key) & ((1 << HASH_BITS) - 1), key, default)
+
+    def set(self, key, value):
+        root = self.root or BitmapNode(0, ())
+        root, added = root.assoc(0, hash(key) & ((1 << HASH_BITS) - 1), key, value)
+        return PMap(root, self.count + added)
+
+    def delete(self, key):
+        if self.root is None:
+            raise KeyError(key)
+        root, removed = self.root.without(0, hash(key) & ((1 << HASH_BITS) - 1), key)
+        if not removed:
+            raise KeyError(key)
+        return PMap(root, self.count - 1)
+
+    _missing = object()
+
+    def __getitem__(self, key):
+        v = self.get(key, PMap._missing)
+        if v is PMap._missing:
+            raise KeyError(key)
+        return v
+
+    def __contains__(self, key):
+        return self.get(key, PMap._missing) is not PMap._missing
+
+    def __setitem__(self, key, value):
+        raise TypeError("PMap is immutable; use set()")
+
+    def __len__(self):
+        return self.count
+
+    def items(self):
+        return self.root.items() if self.root is not None else iter(())
+
+    def keys(self):
+        return (k for k, _ in self.items())
+
+    def values(self):
+        return (v for _, v in self.items())
+
+    def __iter__(self):
+        return self.keys()
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, (PMap, dict)):
+            return len(self) == len(other) and all(k in other and other[k] == v for k, v in self.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{" + ", ".join(f"{k!r}: {v!r}" for k, v in self.items()) + "}"
+
+    def __reduce__(self):
+        return (PMap.from_items, (list(self.items()),))
+
+def assoc_in(container, path, value):
+    # persistent update along an index path; plain lists and dicts are updated in place
+    if not path:
+        return value
+    key, rest = path[0], path[1:]
+    if isinstance(container, (PVector, PMap)):
+        return container.set(key, assoc_in(container[key], rest, value) if rest else value)
+    if rest:
+        container[key] = assoc_in(container[key], rest, value)
+    else:
+        container[key] = value
+    return container
@@ -1,7 +1,8 @@
 # rinsec.py — CLI compiler for Rinse
 import sys
-from lexer import tokenize
+from lexer import TokenBuffer
 from parser import Parser
+from dgm_passes import optimize
 from ir_gen import gen_ir
 from nasm_gen import gen_nasm
 from vese import VESE
@@ -11,12 +12,10 @@ def main():
         print("Usage: rinsec <file.rn>")
         sys.exit(1)
 
-    with open(sys.argv[1]) as f:
-        code = f.read()
-
-    tokens = tokenize(code)
-    parser = Parser(tokens)
+    # tokens index into the mapped file; the source is never held as one str
+    parser = Parser(TokenBuffer.from_file(sys.argv[1]))
     ast = parser.parse()
+    ast = optimize(ast)
 
     # Generate IR
     ir = gen_ir(ast)
@@ -28,10 +27,10 @@ def main():
     print("\n=== NASM ===")
     print(nasm)
 
-    # Execute in VESE
+    # Execute in VESE: the tree interpreter runs the program the backends compiled
     print("\n=== VESE Execution ===")
     vm = VESE()
-    vm.exec(nasm)
+    vm.exec_program(ast)
 
 if __name__ == "__main__":
     main()
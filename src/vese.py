@@ -311,7 +311,7 @@ class VESE:
 
         # [existing ops...]
 
-        elif op == "inc":
+        if op == "inc":
             reg = parts[1]
             self.registers[reg] += 1
 
@@ -1104,7 +1104,7 @@ def exec_stmt(self, stmt):
                         return self.exec_do(rest)
                     return x
                 expr = self.monad_bind(monad_val, cont)
-            elif child.tag == "RETURN":
+            elif child.tag == DGM_MAP["RETURN"]:
                 expr = self.eval_expr(child.children[0])
         return expr
 
@@ -1147,7 +1147,7 @@ def monad_bind(self, monad, cont):
     return monad
 
 def eval_expr(self, node):
-    if node.tag == "LIST_COMPREHENSION":
+    if node.tag == DGM_MAP["LIST_COMPREHENSION"]:
         expr = node.children[0]
         binds = [c for c in node.children[1:] if c.tag == DGM_MAP["MONAD_BIND"]]
         cond  = node.children[-1] if node.children and node.children[-1].tag not in (DGM_MAP["MONAD_BIND"],) else None
@@ -1227,9 +1227,11 @@ class VeseTask:
         self.result = None
         self.done = False
         self.cond = threading.Condition()
+        TASKS.queue()
 
     def run(self):
-        val = self.fn()
+        with TASKS.run():
+            val = self.fn()
         with self.cond:
             self.result = val
             self.done = True
@@ -1270,3 +1272,2499 @@ def exec_stmt(self, stmt):
             results.append(task.result)
         return results[-1] if results else None
 
+# vese.py — tree interpreter
+
+from ast_dgm import Arena, ASTNode, DGM_MAP, TAGS
+
+class VESE(VESE):
+    # the classes and fragments above each cover a few statement kinds; this layer is the
+    # complete tree walker they grew towards, and every section below extends it with
+    # its own `class VESE(VESE):` that falls back to super()
+    def __init__(self):
+        super().__init__()
+        self.registers = {"eax": 0, "ebx": 0, "ecx": 0, "edx": 0}
+        self.stack = []
+        self.heap = {}
+        self.scope_stack = [{}]
+        self.functions = {}        # name -> (PARAMS, BLOCK)
+        self.struct_defs = {}      # name -> [field names]
+        self.struct_methods = {}   # {struct_name: {method_name: [overloads]}}
+        self.traits = {}           # {trait_name: {"methods": names, "parent": parent}}
+        self.impls = {}            # {(struct, trait): methods}
+        self.generic_traits = {}
+        self.generic_impls = {}
+        self.variants = {}         # variant name -> (enum name, field types)
+        self.current_handler = {}
+        self.return_flag = False
+        self.return_value = None
+        self.break_flag = False
+        self.continue_flag = False
+
+    def push_scope(self): self.scope_stack.append({})
+    def pop_scope(self): self.scope_stack.pop()
+    def set_var(self, name, val): self.scope_stack[-1][name] = val
+    def get_var(self, name):
+        for scope in reversed(self.scope_stack):
+            if name in scope: return scope[name]
+        raise NameError(f"Variable {name} not found")
+
+    def assign_var(self, name, val):
+        # `x = v` writes the frame that holds x; a loop body's frame must not shadow it
+        for scope in reversed(self.scope_stack):
+            if name in scope:
+                scope[name] = val
+                return
+        self.set_var(name, val)
+
+    def is_identifier(self, name):
+        return isinstance(name, str) and name.isidentifier() and name not in ("wildcard", "tuple", "range")
+
+    run_io = run_io
+    run_state = run_state
+    run_reader = run_reader
+    run_writer = run_writer
+
+    def exec_program(self, ast):
+        if isinstance(ast, Arena):
+            ast = ast.to_tree()   # the walker follows child links; arenas are for the backends
+        return self.exec_stmt(ast)
+
+    def exec_block(self, stmts):
+        result = None
+        for s in stmts:
+            result = self.exec_stmt(s)
+            if self.return_flag or self.break_flag or self.continue_flag:
+                break
+        return result
+
+    def exec_loop_body(self, block, var=None, value=None):
+        # one iteration: True when the loop must stop
+        self.push_scope()
+        try:
+            if var is not None:
+                self.set_var(var, value)
+            self.exec_block(block.children)
+        finally:
+            self.pop_scope()
+        self.continue_flag = False
+        return self.return_flag or self.break_flag
+
+    def call_function(self, fn, args):
+        if callable(fn):
+            return fn(*args)
+        params, block = fn   # a flow value: (params node, body block)
+        saved = (self.return_flag, self.return_value, self.break_flag, self.continue_flag)
+        self.return_flag, self.return_value = False, None
+        self.break_flag = self.continue_flag = False
+        self.push_scope()
+        try:
+            for p, a in zip(params.value, args):
+                self.set_var(p, a)
+            self.exec_block(block.children)
+            return self.return_value if self.return_flag else None
+        finally:
+            self.pop_scope()
+            self.return_flag, self.return_value, self.break_flag, self.continue_flag = saved
+
+    def lookup_callable(self, name):
+        for scope in reversed(self.scope_stack):
+            if name in scope:
+                return scope[name]
+        return self.functions.get(name)
+
+    def construct_struct(self, sname, values):
+        obj = {"__type__": sname}
+        obj.update(zip(self.struct_defs[sname], values))
+        return obj
+
+    def exec_call(self, name, args):
+        fn = self.lookup_callable(name)
+        if fn is not None:
+            return self.call_function(fn, args)
+        if name in self.variants:
+            return self.construct_variant(self.variants[name][0], name, args)
+        if name in self.struct_defs:
+            return self.construct_struct(name, args)
+        raise NameError(f"Function {name} not defined")
+
+    def exec_method_call(self, stmt):
+        base, mname = stmt.value
+        obj = self.get_var(base)
+        sname = obj.get("__type__", type(obj).__name__) if isinstance(obj, dict) else type(obj).__name__
+        args = [self.eval_expr(a) for a in stmt.children]
+        for params, block in self.struct_methods.get(sname, {}).get(mname, []):
+            if len(params.value) == len(args):
+                self.push_scope()
+                try:
+                    self.set_var("self", obj)
+                    result = self.call_function((params, block), args)
+                finally:
+                    self.pop_scope()
+                return result
+        raise NameError(f"{sname} has no method {mname}/{len(args)}")
+
+    def add_method(self, sname, method):
+        params, block = method.children
+        self.struct_methods.setdefault(sname, {}).setdefault(method.value[1], []).append((params, block))
+
+    def exec_stmt(self, stmt):
+        tag = stmt.tag
+        if tag == DGM_MAP["PROGRAM"]:
+            return self.exec_block(stmt.children[0].children)
+        elif tag in (DGM_MAP["BLOCK"], DGM_MAP["NEST"]):
+            block = stmt if tag == DGM_MAP["BLOCK"] else stmt.children[0]
+            self.push_scope()
+            try:
+                return self.exec_block(block.children)
+            finally:
+                self.pop_scope()
+        elif tag == DGM_MAP["VAR"] and isinstance(stmt.value, tuple):
+            self.set_var(stmt.value[0], self.eval_expr(stmt.children[0]))
+        elif tag == DGM_MAP["ASSIGN"]:
+            if len(stmt.children) == 1:
+                self.assign_var(stmt.value, self.eval_expr(stmt.children[0]))
+            else:
+                # name[i] = v, or name[i][j] = v with the path under one ITEM node
+                index = stmt.children[0]
+                if index.tag == DGM_MAP["ITEM"] and index.value == "path":
+                    indices = [self.eval_expr(n) for n in index.children]
+                else:
+                    indices = [self.eval_expr(index)]
+                ref = self.get_var(stmt.value)
+                for i in indices[:-1]:
+                    ref = ref[i]
+                ref[indices[-1]] = self.eval_expr(stmt.children[1])
+        elif tag == DGM_MAP["FIELD_ASSIGN"]:
+            base, field = stmt.value
+            obj = self.get_var(base)
+            if not isinstance(obj, dict):
+                raise TypeError(f"{base} is not a struct")
+            obj[field] = self.eval_expr(stmt.children[0])
+        elif tag == DGM_MAP["FLOW"] and stmt.value == "print":
+            print(self.eval_expr(stmt.children[0]))
+        elif tag == DGM_MAP["FUNC_DEF"]:
+            params, block = stmt.children
+            self.functions[stmt.value] = (params, block)
+        elif tag == DGM_MAP["FUNC_CALL"]:
+            return self.exec_call(stmt.value, [self.eval_expr(a) for a in stmt.children])
+        elif tag == DGM_MAP["RETURN"]:
+            self.return_value = self.eval_expr(stmt.children[0]) if stmt.children else None
+            self.return_flag = True
+        elif tag == DGM_MAP["IF"]:
+            cond, then_block, else_block = stmt.children
+            block = then_block if self.eval_expr(cond) else else_block
+            if block is not None:
+                return self.exec_block(block.children)
+        elif tag == DGM_MAP["FOR"]:
+            start, end, block = stmt.children
+            for i in range(self.eval_expr(start), self.eval_expr(end) + 1):
+                if self.exec_loop_body(block, stmt.value, i):
+                    break
+            self.break_flag = False
+        elif tag == DGM_MAP["WHILE"]:
+            cond, block = stmt.children
+            while self.eval_expr(cond):
+                if self.exec_loop_body(block):
+                    break
+            self.break_flag = False
+        elif tag == DGM_MAP["BREAK"]:
+            self.break_flag = True
+        elif tag == DGM_MAP["CONTINUE"]:
+            self.continue_flag = True
+        elif tag == DGM_MAP["SWITCH"]:
+            value = self.eval_expr(stmt.value)
+            for child in stmt.children:
+                if child.tag == DGM_MAP["CASE"]:
+                    pattern, block = child.children
+                elif child.tag == DGM_MAP["DEFAULT"]:
+                    pattern, block = None, child.children[0]
+                else:
+                    continue
+                self.push_scope()   # pattern bindings live in the case's own frame
+                try:
+                    if pattern is None or self.match_pattern(pattern, value):
+                        return self.exec_block(block.children)
+                finally:
+                    self.pop_scope()
+        elif tag == DGM_MAP["STRUCT"]:
+            fields = [f.value[0] for f in stmt.children if f.tag == DGM_MAP["VAR"]]
+            self.struct_defs[stmt.value] = fields
+            for m in stmt.children:
+                if m.tag == DGM_MAP["METHOD_DEF"]:
+                    self.add_method(stmt.value, m)
+        elif tag == DGM_MAP["METHOD_DEF"]:
+            self.add_method(stmt.value[0], stmt)
+        elif tag == DGM_MAP["METHOD_CALL"]:
+            return self.exec_method_call(stmt)
+        elif tag == DGM_MAP["PROOF"]:
+            cond, block = stmt.children
+            if not self.eval_expr(cond):
+                raise AssertionError("Proof failed in VESE")
+            return self.exec_block(block.children)
+        elif tag == DGM_MAP["TRAIT_DEF"]:
+            tname, parent = stmt.value if isinstance(stmt.value, tuple) else (stmt.value, None)
+            self.traits[tname] = {"methods": stmt.children, "parent": parent}
+        elif tag in (DGM_MAP["GENERIC_TRAIT"], DGM_MAP["GENERIC_HIGHER"]):
+            tname, type_params = stmt.value[0], stmt.value[1]
+            self.generic_traits[(tname, tuple(type_params))] = {"methods": stmt.children, "parent": None}
+        elif tag == DGM_MAP["TRAIT_IMPL"]:
+            sname, tname = stmt.value
+            self.impls[(sname, tname)] = stmt.children
+            for m in stmt.children:
+                self.add_method(sname, m)
+        elif tag == DGM_MAP["GENERIC_IMPL"]:
+            sname, tname, type_args = stmt.value
+            self.generic_impls[(sname, tname, tuple(type_args))] = stmt.children
+            self.impls.setdefault((sname, tname), stmt.children)
+            for m in stmt.children:
+                self.add_method(sname, m)
+        elif tag == DGM_MAP["ENUM_DEF"]:
+            ename, _ = stmt.value
+            self.enums[ename] = {v.value[0]: v.value[1] for v in stmt.children}
+            for vname, fields in self.enums[ename].items():
+                self.variants[vname] = (ename, fields)
+        elif tag == DGM_MAP["DESTRUCT"]:
+            val = self.eval_expr(stmt.children[0])
+            if isinstance(stmt.value, list):   # let (a, b) = ...
+                names, values = stmt.value, val
+            else:                              # let Person(name, age) = ...
+                names = stmt.value[1]
+                values = val["fields"] if "__enum__" in val else [v for k, v in val.items() if k != "__type__"]
+            for name, v in zip(names, values):
+                self.set_var(name, v)
+        elif tag == DGM_MAP["EFFECT_BLOCK"]:
+            return self.exec_block(stmt.children)
+        elif tag == DGM_MAP["EFFECT_INVOKE"]:
+            raise Exception(f"Unhandled effect operation {stmt.value}")
+        elif tag in EXPR_TAGS:
+            return self.eval_expr(stmt)
+        else:
+            raise RuntimeError(f"VESE cannot execute {TAGS[stmt.tag].name}")
+
+    def eval_expr(self, expr):
+        tag = expr.tag
+        if tag in (DGM_MAP["VALUE"], DGM_MAP["BOOL"]):
+            return expr.value
+        elif tag == DGM_MAP["VAR"] and isinstance(expr.value, str):
+            name = expr.value
+            for scope in reversed(self.scope_stack):
+                if name in scope:
+                    return scope[name]
+            if name in self.functions:
+                return self.functions[name]
+            if name in self.variants and not self.variants[name][1]:
+                return self.construct_variant(self.variants[name][0], name, [])
+            raise NameError(f"Variable {name} not found")
+        elif tag == DGM_MAP["EXPR"]:
+            op = expr.value
+            if op == "not":
+                return not self.eval_expr(expr.children[0])
+            left = self.eval_expr(expr.children[0])
+            if op == "and":
+                return left and self.eval_expr(expr.children[1])
+            if op == "or":
+                return left or self.eval_expr(expr.children[1])
+            return self.eval_binop(op, left, self.eval_expr(expr.children[1]))
+        elif tag == DGM_MAP["INDEX"]:
+            if expr.value is not None:   # older shape: INDEX(name, [index])
+                return self.get_var(expr.value)[self.eval_expr(expr.children[0])]
+            return self.eval_expr(expr.children[0])[self.eval_expr(expr.children[1])]
+        elif tag == DGM_MAP["FIELD"]:
+            base, field = expr.value
+            obj = self.get_var(base)
+            if isinstance(obj, dict):
+                return obj[field]
+            return obj[int(field)]
+        elif tag == DGM_MAP["TUPLE"]:
+            return tuple(self.eval_expr(e) for e in expr.children)
+        elif tag in (DGM_MAP["LIST"], DGM_MAP["ARRAY"]):
+            return [self.eval_expr(e) for e in expr.children]
+        elif tag == DGM_MAP["LIST_COMPREHENSION"]:
+            head = expr.children[0]
+            binds = [c for c in expr.children[1:] if c.tag == DGM_MAP["MONAD_BIND"]]
+            conds = [c for c in expr.children[1:] if c.tag != DGM_MAP["MONAD_BIND"]]
+            out = []
+            self.push_scope()
+            try:
+                self.comprehend(head, binds, conds, out)
+            finally:
+                self.pop_scope()
+            return out
+        # everything else (calls, method calls, blocks used as values, ...) is a statement
+        # whose result is the value; layers below intercept it in exec_stmt
+        return self.exec_stmt(expr)
+
+    def comprehend(self, head, binds, conds, out):
+        if not binds:
+            if all(self.eval_expr(c) for c in conds):
+                out.append(self.eval_expr(head))
+            return
+        var, src = binds[0].value, binds[0].children[0]
+        source = self.eval_expr(src)
+        if isinstance(source, dict):   # a Cons list
+            items = []
+            while source.get("__variant__") == "Cons":
+                h, source = source["fields"]
+                items.append(h)
+            source = items
+        for item in source:
+            self.set_var(var, item)
+            self.comprehend(head, binds[1:], conds, out)
+
+    def eval_binop(self, op, left, right):
+        if op == "+": return left + right
+        if op == "-": return left - right
+        if op == "*": return left * right
+        if op == "/":
+            if right == 0:
+                raise ZeroDivisionError("Division by zero in VESE")
+            return left // right if isinstance(left, int) and isinstance(right, int) else left / right
+        if op == "^": return pow(left, right)
+        if op == "<": return left < right
+        if op == "<=": return left <= right
+        if op == ">": return left > right
+        if op == ">=": return left >= right
+        if op == "==": return left == right
+        if op == "!=": return left != right
+        raise TypeError(f"Unsupported operator {op} for {type(left).__name__}")
+
+    def construct_variant(self, ename, vname, values):
+        return {"__enum__": ename, "__variant__": vname, "fields": values}
+
+    def match_pattern(self, pattern, value):
+        if pattern.tag == DGM_MAP["VALUE"]:
+            return pattern.value == value
+        if pattern.tag != DGM_MAP["PATTERN"]:
+            return self.eval_expr(pattern) == value
+        kind = pattern.value
+        if kind == "wildcard":
+            return True
+        if kind == "tuple":
+            return (isinstance(value, tuple) and len(value) == len(pattern.children)
+                    and all(self.match_pattern(p, v) for p, v in zip(pattern.children, value)))
+        if kind == "range":
+            lo, hi = pattern.children
+            return lo.value <= value <= hi.value
+        if isinstance(kind, tuple) and kind[0] == "struct":
+            _, name = kind
+            if not isinstance(value, dict):
+                return False
+            if "__enum__" in value:
+                if value["__variant__"] != name:
+                    return False
+                fields = value["fields"]
+            elif value.get("__type__") == name:
+                fields = [v for k, v in value.items() if k != "__type__"]
+            else:
+                return False
+            return (len(fields) == len(pattern.children)
+                    and all(self.match_pattern(p, v) for p, v in zip(pattern.children, fields)))
+        if kind in self.variants and not self.variants[kind][1]:
+            # a nullary variant name compares; any other name binds
+            return isinstance(value, dict) and value.get("__variant__") == kind
+        self.set_var(kind, value)
+        return True
+
+# tags eval_expr owns; exec_stmt hands them over when they stand as statements
+EXPR_TAGS = frozenset(DGM_MAP[t] for t in ("VALUE", "BOOL", "VAR", "EXPR", "INDEX", "FIELD", "TUPLE",
+                                           "LIST", "ARRAY", "LIST_COMPREHENSION"))
+
+# vese.py — process-pool execution for parallel blocks
+
+import atexit, io, os, pickle
+from contextlib import redirect_stdout
+import concurrent.futures
+from concurrent.futures import ProcessPoolExecutor
+from ast_dgm import ASTNode, DGM_MAP
+
+PARALLEL_MODE = "thread"        # "thread" | "steal" | "process" | "interp" (subinterpreters, 3.14+)
+POOLED_MODES = ("process", "interp")
+PARALLEL_INLINE_COST = 256      # blocks (and children) cheaper than this stay on the current thread
+PARALLEL_WORKERS = os.cpu_count() or 1
+LOOP_COST = 16
+CALL_COST = 8
+
+_process_pool = None
+
+def get_process_pool():
+    # one persistent pool per VESE process, created on first use
+    global _process_pool
+    if _process_pool is None:
+        if PARALLEL_MODE == "interp" and hasattr(concurrent.futures, "InterpreterPoolExecutor"):
+            _process_pool = concurrent.futures.InterpreterPoolExecutor(max_workers=PARALLEL_WORKERS)
+        else:
+            _process_pool = ProcessPoolExecutor(max_workers=PARALLEL_WORKERS)
+        atexit.register(_process_pool.shutdown)
+    return _process_pool
+
+def vese_metrics(self):
+    if not hasattr(self, "metrics"):
+        self.metrics = {}
+    return self.metrics
+
+def iter_ast(node):
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if not isinstance(n, ASTNode):
+            continue   # missing else blocks, trait method names, ...
+        yield n
+        if isinstance(n.value, ASTNode):
+            stack.append(n.value)
+        stack.extend(reversed(n.children))
+
+def stmt_cost(stmt):
+    cost = 0
+    for n in iter_ast(stmt):
+        if n.tag in (DGM_MAP["FOR"], DGM_MAP["WHILE"]):
+            cost += LOOP_COST
+        elif n.tag == DGM_MAP["FUNC_CALL"]:
+            cost += CALL_COST
+        else:
+            cost += 1
+    return cost
+
+def bound_names(stmt):
+    # names a statement binds in the enclosing scope: its own let/def, and every
+    # variable it assigns, however deep (an outer total updated inside a loop)
+    names = set()
+    if stmt.tag == DGM_MAP["VAR"] and isinstance(stmt.value, tuple):
+        names.add(stmt.value[0])
+    elif stmt.tag == DGM_MAP["FUNC_DEF"]:
+        names.add(stmt.value)
+    elif stmt.tag == DGM_MAP["DESTRUCT"]:
+        names.update(stmt.value if isinstance(stmt.value, list) else stmt.value[1])
+    for n in iter_ast(stmt):
+        if n.tag == DGM_MAP["ASSIGN"]:
+            names.add(n.value)
+        elif n.tag == DGM_MAP["FIELD_ASSIGN"]:
+            names.add(n.value[0])
+    return names
+
+def free_names(stmt):
+    names = set()
+    for n in iter_ast(stmt):
+        if n.tag in (DGM_MAP["VAR"], DGM_MAP["INDEX"], DGM_MAP["ASSIGN"]) and isinstance(n.value, str):
+            names.add(n.value)
+        elif n.tag in (DGM_MAP["FIELD"], DGM_MAP["FIELD_ASSIGN"]):
+            names.add(n.value[0])
+        elif n.tag == DGM_MAP["FUNC_CALL"]:
+            names.add(n.value)
+    return names
+
+def capture_env(self, names, arena=None):
+    env = {}
+    for name in names:
+        for scope in reversed(self.scope_stack):
+            if name in scope:
+                env[name] = scope[name] if arena is None else arena.share(scope[name])
+                break
+    return env
+
+# every definition table a worker needs to resolve calls, methods, traits and variants
+PROGRAM_TABLES = ("functions", "struct_defs", "struct_methods", "traits", "impls",
+                  "generic_traits", "generic_impls", "enums", "variants", "vtables", "trait_tables")
+
+def program_tables(self):
+    # plain dicts: a fork's ChainMap overlays cannot be pickled
+    return {name: dict(getattr(self, name)) for name in PROGRAM_TABLES
+            if getattr(self, name, None) is not None}
+
+def worker_vm(env, tables):
+    vm = VESE()
+    vm.scope_stack = [env]
+    for name, table in tables.items():
+        setattr(vm, name, table)
+    vm.return_flag = False
+    vm.return_value = None
+    return vm
+
+def settle(futures):
+    # drop queued work and wait out running work, e.g. before its shared arena is released
+    pending = [f for f in futures if f is not None and not f.cancel()]
+    concurrent.futures.wait(pending)
+
+def _run_parallel_child(blob):
+    # worker side: fresh VESE over the pickled inputs, stdout captured for ordered replay
+    stmt, env, tables = pickle.loads(blob)
+    vm = worker_vm(env, tables)
+    out = io.StringIO()
+    with redirect_stdout(out):
+        result, returned = vm.take_return(vm.exec_stmt(stmt))
+    bindings = {n: env[n] for n in bound_names(stmt) if n in env}
+    return result, returned, bindings, out.getvalue()
+
+def children_independent(children):
+    bound = set()
+    for s in children:
+        if free_names(s) & bound:
+            return False   # reads a sibling's binding
+        bound |= bound_names(s)
+    return True
+
+def plan_parallel(self, children, arena):
+    """Return per-child pickled inputs, or None when the block must run inline."""
+    if PARALLEL_MODE not in POOLED_MODES:
+        return None
+    costs = [stmt_cost(s) for s in children]
+    if sum(costs) < PARALLEL_INLINE_COST or not children_independent(children):
+        return None
+    plan = []
+    for s, cost in zip(children, costs):
+        if cost < PARALLEL_INLINE_COST:
+            plan.append(None)
+            continue
+        try:
+            plan.append(pickle.dumps((s, self.capture_env(free_names(s), arena), self.program_tables())))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return None   # tasks, closures, ... cannot leave this process
+    return plan
+
+def take_return(self, result):
+    # (value, returned) after a child of a parallel block ran: a `return` anywhere in
+    # it, not just a RETURN child, ends the block in every execution mode
+    if self.return_flag:
+        self.return_flag = False
+        return self.return_value, True
+    return result, False
+
+def exec_parallel_inline(self, children):
+    result = None
+    for s in children:
+        result, returned = self.take_return(self.exec_stmt(s))
+        if returned:
+            break
+    return result
+
+def exec_parallel_process(self, children, plan):
+    metrics = self.vese_metrics()
+    pool = get_process_pool()
+    futures = [pool.submit(_run_parallel_child, blob) if blob else None for blob in plan]
+    result = None
+    try:
+        # merge in statement order so output and bindings are deterministic
+        for s, fut in zip(children, futures):
+            if fut is None:
+                metrics["parallel_inline_children"] = metrics.get("parallel_inline_children", 0) + 1
+                result, returned = self.take_return(self.exec_stmt(s))
+            else:
+                metrics["parallel_pooled_children"] = metrics.get("parallel_pooled_children", 0) + 1
+                result, returned, bindings, out = fut.result()
+                result = unshare(result)
+                if out:
+                    print(out, end="")
+                for name, v in bindings.items():
+                    self.set_var(name, unshare(v))
+            if returned:
+                break
+    finally:
+        settle(futures)
+    return result
+
+class VESE(VESE):
+    vese_metrics = vese_metrics
+    capture_env = capture_env
+    program_tables = program_tables
+    plan_parallel = plan_parallel
+    take_return = take_return
+    exec_parallel_inline = exec_parallel_inline
+    exec_parallel_process = exec_parallel_process
+
+    def exec_stmt(self, stmt):
+        if stmt.tag == DGM_MAP["PARALLEL_BLOCK"]:
+            arena = SharedArena()
+            try:
+                plan = self.plan_parallel(stmt.children, arena)
+                if plan is not None:
+                    return self.exec_parallel_process(stmt.children, plan)
+            finally:
+                arena.release()
+            if (PARALLEL_MODE in POOLED_MODES or stmt_cost(stmt) < PARALLEL_INLINE_COST
+                    or not children_independent(stmt.children)):
+                metrics = self.vese_metrics()
+                metrics["parallel_inline_blocks"] = metrics.get("parallel_inline_blocks", 0) + 1
+                return self.exec_parallel_inline(stmt.children)
+            if PARALLEL_MODE == "steal":
+                return self.exec_parallel_steal(stmt.children)
+            return self.exec_parallel_threads(stmt.children)
+        return super().exec_stmt(stmt)
+
+# vese.py — cooperative fiber scheduler for async/await
+
+from collections import deque
+
+class VeseFiber:
+    __slots__ = ("fid", "gen", "scopes", "sched", "result", "done", "running")
+
+    def __init__(self, fid, gen, scopes, sched):
+        self.fid = fid
+        self.gen = gen
+        self.scopes = scopes
+        self.sched = sched
+        self.result = None
+        self.done = False
+        self.running = False
+
+    def await_result(self):
+        self.sched.run_until(self)
+        return self.result
+
+class FiberScheduler:
+    # single run queue, FIFO: fibers interleave at statement boundaries in spawn order
+    def __init__(self, vm):
+        self.vm = vm
+        self.run_queue = deque()
+        self.next_id = 0
+        self.live = 0
+        self.peak = 0
+        self.switches = 0
+        self.stalled = 0   # consecutive steps where the stepped fiber was blocked
+
+    def spawn(self, gen, scope_stack):
+        fiber = VeseFiber(self.next_id, gen, scope_stack + [{}], self)
+        self.next_id += 1
+        self.live += 1
+        self.peak = max(self.peak, self.live)
+        self.run_queue.append(fiber)
+        return fiber
+
+    def step(self, fiber):
+        vm = self.vm
+        saved = (vm.scope_stack, vm.return_flag, vm.return_value, vm.break_flag, vm.continue_flag)
+        vm.scope_stack, vm.return_flag, vm.return_value = fiber.scopes, False, None
+        vm.break_flag = vm.continue_flag = False
+        fiber.running = True
+        self.switches += 1
+        try:
+            blocked = next(fiber.gen)
+            self.stalled = self.stalled + 1 if blocked is not None else 0
+            self.run_queue.append(fiber)
+        except StopIteration as stop:
+            fiber.result = stop.value
+            fiber.done = True
+            fiber.gen = None
+            self.live -= 1
+            self.stalled = 0
+        finally:
+            fiber.running = False
+            (vm.scope_stack, vm.return_flag, vm.return_value,
+             vm.break_flag, vm.continue_flag) = saved
+
+    def check_stall(self):
+        if self.stalled > len(self.run_queue):
+            raise RuntimeError("Deadlock: every runnable fiber is blocked")
+
+    def run_until(self, fiber):
+        # an await outside any fiber drives the loop; fibers yield instead (see awaiting)
+        while not fiber.done:
+            if fiber.running:
+                raise RuntimeError(f"Fiber {fiber.fid} awaits itself")
+            if not self.run_queue:
+                raise RuntimeError(f"Deadlock: fiber {fiber.fid} cannot make progress")
+            self.check_stall()
+            self.step(self.run_queue.popleft())
+
+    def drain(self):
+        while self.run_queue:
+            self.check_stall()
+            self.step(self.run_queue.popleft())
+
+def fibers(self):
+    if not hasattr(self, "scheduler"):
+        self.scheduler = FiberScheduler(self)
+    return self.scheduler
+
+def fiber_block(self, stmts):
+    result = yield from self.fiber_stmts(stmts)
+    if self.return_flag:
+        self.return_flag = False
+        return self.return_value
+    return result
+
+def fiber_stmts(self, stmts):
+    # yields None after each statement, or the channel a statement would block on
+    result = None
+    for s in stmts:
+        # an await on an unfinished fiber suspends this fiber rather than nesting the scheduler
+        waiting = self.awaiting(s) or self.blocked_on(s)
+        while waiting is not None:
+            yield waiting
+            waiting = self.awaiting(s) or self.blocked_on(s)
+        if s.tag in (DGM_MAP["FOR"], DGM_MAP["WHILE"], DGM_MAP["IF"]):
+            result = yield from self.fiber_compound(s)
+        elif self.suspends(s):
+            result = yield from self.fiber_exec(s)
+        else:
+            result = self.exec_stmt(s)
+        if self.return_flag or self.break_flag or self.continue_flag:
+            return result
+        yield None
+    return result
+
+def fiber_compound(self, stmt):
+    # loops and ifs are entered so a fiber can also suspend inside their bodies
+    if stmt.tag == DGM_MAP["IF"]:
+        cond, then_block, else_block = stmt.children
+        block = then_block if (yield from self.fiber_eval(cond)) else else_block
+        if block is None:
+            return None
+        return (yield from self.fiber_stmts(block.children))
+    if stmt.tag == DGM_MAP["FOR"]:
+        var = stmt.value
+        start, end, block = stmt.children
+        lo = yield from self.fiber_eval(start)
+        hi = yield from self.fiber_eval(end)
+        for i in range(lo, hi + 1):
+            self.push_scope()
+            self.set_var(var, i)
+            yield from self.fiber_stmts(block.children)
+            self.pop_scope()
+            self.continue_flag = False
+            if self.return_flag or self.break_flag:
+                break
+    else:
+        cond, block = stmt.children
+        while (yield from self.fiber_eval(cond)):
+            self.push_scope()
+            yield from self.fiber_stmts(block.children)
+            self.pop_scope()
+            self.continue_flag = False
+            if self.return_flag or self.break_flag:
+                break
+    self.break_flag = False
+    return None
+
+def await_names(stmt):
+    # variables awaited by `stmt`, outside nested async blocks
+    names, stack = [], [stmt]
+    while stack:
+        n = stack.pop()
+        if not isinstance(n, ASTNode) or n.tag == DGM_MAP["ASYNC_BLOCK"]:
+            continue
+        if (n.tag in TASK_CALL_TAGS and n.value == "await"
+                and n.children and n.children[0].tag == DGM_MAP["VAR"]):
+            names.append(n.children[0].value)
+        stack.extend(n.children)
+    return names
+
+def awaiting(self, stmt):
+    """Unfinished fiber that `stmt` awaits, so the awaiting fiber can yield first."""
+    if stmt.tag in (DGM_MAP["FOR"], DGM_MAP["WHILE"], DGM_MAP["IF"]):
+        return None
+    cache = node_cache(stmt)
+    names = cache.get("awaits")
+    if names is None:
+        names = cache["awaits"] = await_names(stmt)
+    for name in names:
+        try:
+            fiber = self.get_var(name)
+        except NameError:
+            continue
+        if isinstance(fiber, VeseFiber) and not fiber.done:
+            if fiber.running:
+                raise RuntimeError(f"Fiber {fiber.fid} awaits itself")
+            return fiber
+    return None
+
+TASK_CALL_TAGS = (DGM_MAP["EFFECT_INVOKE"], DGM_MAP["FUNC_CALL"])   # `spawn(f)` parses as a plain call
+
+def suspends(self, node):
+    # whether running `node` may enter a flow or await a fiber (nested async bodies aside)
+    cache = node_cache(node)
+    found = cache.get("suspends")
+    if found is None:
+        found, stack = False, [node]
+        while stack and not found:
+            n = stack.pop()
+            if not isinstance(n, ASTNode) or n.tag == DGM_MAP["ASYNC_BLOCK"]:
+                continue
+            found = n.tag in TASK_CALL_TAGS
+            stack.extend(n.children)
+        cache["suspends"] = found
+    return found
+
+def flow_target(self, node):
+    # the (params, block) a call goes straight to; handled ops, builtins and
+    # constructors run in one step
+    if node.tag != DGM_MAP["FUNC_CALL"] or getattr(node, "handler", None) or self.handles(node.value):
+        return None
+    fn = self.lookup_callable(node.value)
+    return fn if isinstance(fn, tuple) else None
+
+def fiber_call(self, fn, args=()):
+    # call_function as a generator: the flow's statements are fiber steps, so an
+    # await or a full channel anywhere below suspends the fiber that called it
+    if callable(fn):
+        return fn(*args)
+    params, block = fn
+    saved = (self.return_flag, self.return_value, self.break_flag, self.continue_flag)
+    self.return_flag, self.return_value = False, None
+    self.break_flag = self.continue_flag = False
+    self.push_scope()
+    for p, a in zip(params.value, args):
+        self.set_var(p, a)
+    yield from self.fiber_stmts(block.children)
+    result = self.return_value if self.return_flag else None
+    self.pop_scope()
+    self.return_flag, self.return_value, self.break_flag, self.continue_flag = saved
+    return result
+
+def fiber_eval(self, expr):
+    # eval_expr as a generator for the shapes a call can sit in; anything else
+    # (and any expression without calls) is evaluated in one step
+    if not isinstance(expr, ASTNode) or not self.suspends(expr):
+        return self.eval_expr(expr)
+    op = self.task_op(expr)
+    if op == "await":
+        task = yield from self.fiber_eval(expr.children[0])
+        if not isinstance(task, VeseFiber):
+            return task.await_result()
+        while not task.done:
+            if task.running:
+                raise RuntimeError(f"Fiber {task.fid} awaits itself")
+            yield task
+        return task.result
+    if expr.tag == DGM_MAP["EXPR"]:
+        op = expr.value
+        left = yield from self.fiber_eval(expr.children[0])
+        if op == "not":
+            return not left
+        if (op == "and" and not left) or (op == "or" and left):
+            return left
+        right = yield from self.fiber_eval(expr.children[1])
+        return right if op in ("and", "or") else self.eval_binop(op, left, right)
+    fn = self.flow_target(expr)
+    if fn is None:
+        return self.eval_expr(expr)
+    args = []
+    for a in expr.children:
+        args.append((yield from self.fiber_eval(a)))
+    return (yield from self.fiber_call(fn, args))
+
+def fiber_exec(self, stmt):
+    # the statement forms a call usually sits in; the rest run in one step
+    tag, kids = stmt.tag, stmt.children
+    if tag in TASK_CALL_TAGS:
+        return (yield from self.fiber_eval(stmt))
+    if len(kids) != 1 or not (
+            (tag == DGM_MAP["VAR"] and isinstance(stmt.value, tuple))
+            or tag in (DGM_MAP["ASSIGN"], DGM_MAP["RETURN"])
+            or (tag == DGM_MAP["FLOW"] and stmt.value == "print"
+                and getattr(stmt, "handler", None) is None and not self.handles("print"))):
+        return self.exec_stmt(stmt)
+    value = yield from self.fiber_eval(kids[0])
+    if tag == DGM_MAP["VAR"]:
+        self.set_var(stmt.value[0], value)
+    elif tag == DGM_MAP["ASSIGN"]:
+        self.assign_var(stmt.value, value)
+    elif tag == DGM_MAP["RETURN"]:
+        self.return_value, self.return_flag = value, True
+    else:
+        print(value)
+    return None
+
+def run_fibers(self):
+    sched = self.fibers()
+    sched.drain()
+    metrics = self.vese_metrics()
+    metrics["fibers_spawned"] = sched.next_id
+    metrics["fibers_peak_live"] = sched.peak
+    metrics["fiber_switches"] = sched.switches
+
+class VESE(VESE):
+    fibers = fibers
+    fiber_block = fiber_block
+    fiber_stmts = fiber_stmts
+    fiber_compound = fiber_compound
+    awaiting = awaiting
+    suspends = suspends
+    flow_target = flow_target
+    fiber_call = fiber_call
+    fiber_eval = fiber_eval
+    fiber_exec = fiber_exec
+    run_fibers = run_fibers
+
+    def task_op(self, stmt):
+        # spawn/await, unless the program defines a flow of the same name
+        if (stmt.tag in TASK_CALL_TAGS and stmt.value in ("spawn", "await")
+                and (stmt.tag == DGM_MAP["EFFECT_INVOKE"] or stmt.value not in self.functions)):
+            return stmt.value
+        return None
+
+    def exec_stmt(self, stmt):
+        op = self.task_op(stmt)
+        if op == "spawn":
+            if PARALLEL_MODE == "steal":
+                # the unit runs on another thread: it gets its own frames and flags
+                vm = self.fork()
+                fn = vm.eval_expr(stmt.children[0])
+                return get_steal_scheduler().submit(lambda: vm.call_function(fn, ()))
+            fn = self.eval_expr(stmt.children[0])
+            return self.fibers().spawn(self.fiber_call(fn), self.scope_stack)
+        elif op == "await":
+            task = self.eval_expr(stmt.children[0])
+            return task.await_result()
+        elif stmt.tag == DGM_MAP["ASYNC_BLOCK"]:
+            if PARALLEL_MODE == "steal":
+                vm = self.fork()
+                return get_steal_scheduler().submit(lambda: vm.exec_task_block(stmt.children))
+            return self.fibers().spawn(self.fiber_block(stmt.children), self.scope_stack)
+        elif stmt.tag == DGM_MAP["PROGRAM"]:
+            # the program's flow ends only once every fiber it started has run to completion
+            result = None
+            for s in stmt.children[0].children:
+                result = self.exec_stmt(s)
+                if self.return_flag:
+                    break
+            self.run_fibers()
+            return result
+        return super().exec_stmt(stmt)
+
+# vese.py — data-parallel `parallel for`
+
+import time
+from functools import reduce
+
+PARALLEL_FOR_CHUNK = 1024   # indices per chunk unless the loop says `chunk N`
+
+REDUCERS = {
+    "+": lambda a, b: a + b,
+    "*": lambda a, b: a * b,
+    "min": min,
+    "max": max,
+}
+
+def run_for_chunk(self, var, lo, hi, block, reducer):
+    values = []
+    for i in range(lo, hi):
+        self.push_scope()
+        self.set_var(var, i)
+        value = self.exec_block(block.children)
+        self.pop_scope()
+        self.continue_flag = False   # `continue` ends this index only; the parser rejects `break`
+        value, _ = self.take_return(value)
+        values.append(value)
+    if reducer:
+        # skipped indices (`continue`) contribute nothing, as empty chunks do
+        values = [v for v in values if v is not None]
+        return reduce(REDUCERS[reducer], values) if values else None
+    return values
+
+def _run_parallel_for_chunk(payload, var, lo, hi, reducer):
+    block, env, tables = pickle.loads(payload)
+    started = time.perf_counter()
+    vm = worker_vm(env, tables)
+    out = io.StringIO()
+    with redirect_stdout(out):
+        part = run_for_chunk(vm, var, lo, hi, block, reducer)
+    return part, time.perf_counter() - started, out.getvalue()
+
+def exec_parallel_for(self, var, lo, hi, block, reducer, chunk):
+    metrics = self.vese_metrics()
+    started = time.perf_counter()
+    bounds = [(a, min(a + chunk, hi)) for a in range(lo, hi, chunk)]
+    payload = None
+    arena = SharedArena()
+    spread = len(bounds) > 1 and stmt_cost(block) * (hi - lo) >= PARALLEL_INLINE_COST
+    if PARALLEL_MODE in POOLED_MODES and spread:
+        try:
+            payload = pickle.dumps((block, self.capture_env(free_names(block) - {var}, arena), self.program_tables()))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            payload = None
+    busy = 0.0
+    lanes = min(PARALLEL_WORKERS, len(bounds))
+    if payload is None and spread and PARALLEL_MODE not in POOLED_MODES:
+        arena.release()
+        parts, busy = self.run_for_forked(var, bounds, block, reducer)
+    elif payload is None:
+        arena.release()
+        parts = [self.run_for_chunk(var, a, b, block, reducer) for a, b in bounds]
+        busy = time.perf_counter() - started
+        lanes = 1
+        metrics["parallel_for_inline"] = metrics.get("parallel_for_inline", 0) + 1
+    else:
+        pool = get_process_pool()
+        futures = [pool.submit(_run_parallel_for_chunk, payload, var, a, b, reducer) for a, b in bounds]
+        parts = []
+        try:
+            for fut in futures:
+                part, elapsed, out = fut.result()
+                if out:
+                    print(out, end="")
+                parts.append(unshare(part))
+                busy += elapsed
+        finally:
+            settle(futures)   # no worker may still be reading a segment we unlink
+            arena.release()
+    # chunks are combined left to right, so the reduction order never depends on scheduling
+    if reducer:
+        parts = [p for p in parts if p is not None]
+        result = reduce(REDUCERS[reducer], parts) if parts else None
+    else:
+        result = [v for part in parts for v in part]
+    wall = time.perf_counter() - started
+    metrics["parallel_for_runs"] = metrics.get("parallel_for_runs", 0) + 1
+    metrics["parallel_for_chunks"] = metrics.get("parallel_for_chunks", 0) + len(bounds)
+    metrics["parallel_for_items"] = metrics.get("parallel_for_items", 0) + max(0, hi - lo)
+    metrics["parallel_for_wall_s"] = metrics.get("parallel_for_wall_s", 0.0) + wall
+    metrics["parallel_for_busy_s"] = metrics.get("parallel_for_busy_s", 0.0) + busy
+    metrics["parallel_for_overhead_s"] = metrics.get("parallel_for_overhead_s", 0.0) + max(0.0, wall - busy / lanes)
+    return result
+
+class VESE(VESE):
+    run_for_chunk = run_for_chunk
+    exec_parallel_for = exec_parallel_for
+
+    def exec_stmt(self, stmt):
+        if stmt.tag == DGM_MAP["PARALLEL_FOR"]:
+            var, reducer = stmt.value
+            start, end, block, chunk_expr = stmt.children
+            lo = self.eval_expr(start)
+            hi = self.eval_expr(end) + 1   # inclusive, like FOR
+            chunk = self.eval_expr(chunk_expr) if chunk_expr else PARALLEL_FOR_CHUNK
+            return self.exec_parallel_for(var, lo, hi, block, reducer, max(1, chunk))
+        return super().exec_stmt(stmt)
+
+    def eval_expr(self, node):
+        # `let xs = parallel for ...`: the mapped list or the reduced value
+        if node.tag == DGM_MAP["PARALLEL_FOR"]:
+            return self.exec_stmt(node)
+        return super().eval_expr(node)
+
+# vese.py — shared-memory arrays for parallel regions
+
+from array import array
+from multiprocessing import shared_memory
+
+SHARED_ARRAY_MIN = 4096   # shorter arrays are cheaper to pickle than to map
+SHARED_ARRAY_COW = True   # worker writes go to a private copy instead of the segment
+
+class SharedArray:
+    # int/float array stored in a shared memory segment; workers get zero-copy views
+    __slots__ = ("shm", "view", "typecode", "length", "owner", "cow", "private")
+
+    def __init__(self, shm, typecode, length, owner, cow):
+        self.shm = shm
+        self.typecode = typecode
+        self.length = length
+        self.owner = owner
+        self.cow = cow
+        self.private = None
+        self.view = shm.buf[:length * array(typecode).itemsize].cast(typecode)
+
+    @classmethod
+    def from_list(cls, values, cow=SHARED_ARRAY_COW):
+        # one element type only: an int in a "d" array would come back as a float
+        kinds = {type(v) for v in values}
+        if kinds == {float}:
+            typecode = "d"
+        elif kinds <= {int}:
+            typecode = "q"
+        else:
+            raise TypeError("SharedArray holds all-int or all-float values")
+        data = array(typecode, values)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(data) * data.itemsize))
+        arr = cls(shm, typecode, len(data), True, cow)
+        arr.view[:] = data
+        return arr
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, idx):
+        src = self.private if self.private is not None else self.view
+        return src[idx].tolist() if isinstance(idx, slice) else src[idx]
+
+    def __setitem__(self, idx, value):
+        if self.cow and not self.owner and self.private is None:
+            self.private = array(self.typecode, self.view)   # first write copies
+        (self.private if self.private is not None else self.view)[idx] = value
+
+    def __iter__(self):
+        return iter(self.private if self.private is not None else self.view)
+
+    def tolist(self):
+        return (self.private if self.private is not None else self.view).tolist()
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+    def __reduce__(self):
+        if self.private is not None:
+            return (list, (self.private.tolist(),))
+        return (_attach_shared_array, (self.shm.name, self.typecode, self.length, self.cow))
+
+    def release(self):
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+
+    def __del__(self):
+        self.release()
+
+def _attach_shared_array(name, typecode, length, cow):
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)   # 3.13+: parent owns it
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+    return SharedArray(shm, typecode, length, False, cow)
+
+class SharedArena:
+    # segments created for one parallel region; the parent unlinks them when it ends
+    def __init__(self, cow=SHARED_ARRAY_COW):
+        self.cow = cow
+        self.shared = []   # (original list, SharedArray)
+
+    def share(self, value):
+        if not isinstance(value, list) or len(value) < SHARED_ARRAY_MIN:
+            return value
+        try:
+            arr = SharedArray.from_list(value, self.cow)
+        except (TypeError, OverflowError):
+            return value   # mixed lists and ints wider than 64 bits stay pickled
+        self.shared.append((value, arr))
+        return arr
+
+    def release(self):
+        for original, arr in self.shared:
+            if not self.cow:
+                original[:] = arr.tolist()   # write-through mode: publish worker writes
+            arr.release()
+        self.shared = []
+
+def unshare(value):
+    # results leave the region as plain values before the segments are unlinked
+    if isinstance(value, SharedArray):
+        return value.tolist()
+    elif isinstance(value, list):
+        return [unshare(v) for v in value]
+    elif isinstance(value, tuple):
+        return tuple(unshare(v) for v in value)
+    elif isinstance(value, dict):
+        return {k: unshare(v) for k, v in value.items()}
+    return value
+
+# vese.py — per-task execution contexts
+
+from collections import ChainMap
+from types import MappingProxyType
+
+# program tables are shared read-only; definitions made inside a task land in its own overlay
+SHARED_TABLES = PROGRAM_TABLES
+
+# per-task state a child starts afresh instead of inheriting
+FORK_FRESH = ("scheduler", "metrics", "cons_table", "cons_stats")
+FORK_FLAGS = ("return_flag", "return_value", "break_flag", "continue_flag")
+
+def fork(self, scope_stack=None):
+    """Child VESE with private frames, flags and handlers over the shared program."""
+    child = object.__new__(type(self))
+    state = child.__dict__
+    for name, value in self.__dict__.items():
+        if name in SHARED_TABLES or name in FORK_FRESH or name in FORK_FLAGS:
+            continue
+        # everything else (caches, settings like hash_cons and persistent) is shared
+        # as it is: the task's own state is its frames, flags and handler stacks below
+        state[name] = value
+    for name in SHARED_TABLES:
+        table = getattr(self, name, None)
+        if table is not None:
+            setattr(child, name, ChainMap({}, MappingProxyType(table)))
+    # copy-on-write frames: reads fall through to the parent's frame, writes stay in
+    # the child's overlay until join_fork publishes the names the task binds
+    frames = list(self.scope_stack if scope_stack is None else scope_stack)
+    child.cow_frames = frames
+    child.scope_stack = [ChainMap({}, MappingProxyType(f)) for f in frames] + [{}]
+    child.return_flag = False
+    child.return_value = None
+    child.break_flag = False
+    child.continue_flag = False
+    # handler frames are immutable links; only the per-operation stacks are copied
+    child.handler_top = getattr(self, "handler_top", None)
+    child.op_handlers = {op: list(stack) for op, stack in getattr(self, "op_handlers", {}).items()}
+    child.metrics = {}
+    return child
+
+def join_fork(self, child, stmt):
+    # publish what `stmt` bound in the child: new names into our top frame,
+    # assignments to outer variables into the frame that holds them
+    top = child.scope_stack[-1]
+    for name in bound_names(stmt):
+        if name in top:
+            self.set_var(name, top[name])
+            continue
+        for base, frame in zip(reversed(child.cow_frames), reversed(child.scope_stack[:-1])):
+            if name in frame.maps[0]:
+                base[name] = frame.maps[0][name]
+                break
+    self.merge_metrics(child)
+
+def exec_task_stmt(self, stmt):
+    # (result, returned, error) of one child of a parallel block
+    try:
+        return (*self.take_return(self.exec_stmt(stmt)), None)
+    except Exception as exc:
+        return None, False, exc
+
+def merge_metrics(self, child):
+    metrics = self.vese_metrics()
+    for key, value in child.metrics.items():
+        metrics[key] = metrics.get(key, 0) + value
+
+def exec_parallel_threads(self, children):
+    # no locks: each thread owns its fork, the parent only reads them back after join
+    forks = [self.fork() for _ in children]
+    threads = []
+    for vm, s in zip(forks, children):
+        task = VeseTask(lambda vm=vm, st=s: vm.exec_task_stmt(st))
+        t = threading.Thread(target=task.run)
+        threads.append((t, task))
+        t.start()
+    with TASKS.joining():
+        for t, _ in threads:
+            t.join()
+    result = None
+    for vm, s, (_, task) in zip(forks, children, threads):
+        result, returned, exc = task.result
+        if exc is not None:
+            raise exc
+        self.join_fork(vm, s)
+        if returned:
+            break
+    metrics = self.vese_metrics()
+    metrics["parallel_thread_blocks"] = metrics.get("parallel_thread_blocks", 0) + 1
+    return result
+
+class VESE(VESE):
+    fork = fork
+    join_fork = join_fork
+    exec_task_stmt = exec_task_stmt
+    merge_metrics = merge_metrics
+    exec_parallel_threads = exec_parallel_threads
+
+# vese.py — work-stealing scheduler for nested parallel and async blocks
+
+class WorkUnit:
+    __slots__ = ("fn", "result", "error", "done", "waiter")
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.result = None
+        self.error = None
+        self.done = False
+        self.waiter = None
+
+    def run(self):
+        try:
+            with TASKS.run():
+                self.result = self.fn()
+        except Exception as exc:
+            self.error = exc
+        self.done = True
+        if self.waiter is not None:
+            self.waiter.set()
+
+    def await_result(self):
+        return get_steal_scheduler().join(self)
+
+class StealWorker:
+    __slots__ = ("wid", "tasks", "executed", "steals", "max_depth")
+
+    def __init__(self, wid):
+        self.wid = wid
+        self.tasks = deque()   # owner pushes/pops the right end, thieves take the left
+        self.executed = 0
+        self.steals = 0
+        self.max_depth = 0
+
+class WorkStealingScheduler:
+    def __init__(self, n_workers=PARALLEL_WORKERS):
+        self.workers = [StealWorker(i) for i in range(n_workers)]
+        self.inject = deque()   # units submitted from outside the pool
+        self.local = threading.local()
+        self.cond = threading.Condition()
+        self.sleeping = 0
+        self.joiners = 0   # workers parked in join() until a unit finishes or work appears
+        self.stopped = False
+        self.threads = [threading.Thread(target=self.loop, args=(w,), daemon=True) for w in self.workers]
+        for t in self.threads:
+            t.start()
+
+    def current(self):
+        return getattr(self.local, "worker", None)
+
+    def submit(self, fn):
+        unit = WorkUnit(fn)
+        TASKS.queue()
+        w = self.current()
+        if w is not None:
+            w.tasks.append(unit)
+            w.max_depth = max(w.max_depth, len(w.tasks))
+        else:
+            self.inject.append(unit)
+        if self.sleeping or self.joiners:
+            with self.cond:
+                self.cond.notify_all()
+        return unit
+
+    def find_work(self, w):
+        if w is not None and w.tasks:
+            try:
+                return w.tasks.pop()
+            except IndexError:
+                pass
+        try:
+            return self.inject.popleft()
+        except IndexError:
+            pass
+        n = len(self.workers)
+        start = w.wid + 1 if w is not None else 0
+        for k in range(n):
+            victim = self.workers[(start + k) % n]
+            if victim is w:
+                continue
+            try:
+                unit = victim.tasks.popleft()   # oldest unit: usually the biggest subtree
+            except IndexError:
+                continue
+            if w is not None:
+                w.steals += 1
+            return unit
+        return None
+
+    def execute(self, w, unit):
+        unit.run()
+        if w is not None:
+            w.executed += 1
+        if self.joiners:
+            with self.cond:
+                self.cond.notify_all()
+
+    def loop(self, w):
+        self.local.worker = w
+        while not self.stopped:
+            unit = self.find_work(w)
+            if unit is not None:
+                self.execute(w, unit)
+                continue
+            with self.cond:
+                self.sleeping += 1
+                self.cond.wait(0.01)   # timed, so a missed notify costs at most one tick
+                self.sleeping -= 1
+
+    def join(self, unit):
+        w = self.current()
+        if w is not None:
+            # a waiting worker keeps running units instead of blocking, so any
+            # nesting depth is served by the same N threads
+            while not unit.done:
+                other = self.find_work(w)
+                if other is not None:
+                    self.execute(w, other)
+                    continue
+                # nothing to steal: sleep until a unit finishes or new work is submitted
+                with TASKS.joining(), self.cond:
+                    self.joiners += 1
+                    if not unit.done:
+                        self.cond.wait(0.01)
+                    self.joiners -= 1
+        elif not unit.done:
+            unit.waiter = threading.Event()
+            with TASKS.joining():
+                while not unit.done:
+                    unit.waiter.wait(0.05)
+        if unit.error is not None:
+            raise unit.error
+        return unit.result
+
+    def stats(self):
+        return {
+            "workers": len(self.workers),
+            "queue_depth": [len(w.tasks) for w in self.workers],
+            "inject_depth": len(self.inject),
+            "max_queue_depth": [w.max_depth for w in self.workers],
+            "executed": [w.executed for w in self.workers],
+            "steals": [w.steals for w in self.workers],
+            "total_steals": sum(w.steals for w in self.workers),
+        }
+
+    def shutdown(self):
+        self.stopped = True
+        with self.cond:
+            self.cond.notify_all()
+
+_steal_scheduler = None
+_steal_lock = threading.Lock()
+
+def get_steal_scheduler():
+    global _steal_scheduler
+    if _steal_scheduler is None:
+        with _steal_lock:   # creation only, never taken on the submit/steal path
+            if _steal_scheduler is None:
+                _steal_scheduler = WorkStealingScheduler()
+                atexit.register(_steal_scheduler.shutdown)
+    return _steal_scheduler
+
+def exec_task_block(self, stmts):
+    result = None
+    for s in stmts:
+        result, returned = self.take_return(self.exec_stmt(s))
+        if returned:
+            break
+    return result
+
+def exec_parallel_steal(self, children):
+    sched = get_steal_scheduler()
+    forks = [self.fork() for _ in children]
+    units = [sched.submit(lambda vm=vm, st=s: vm.exec_task_stmt(st)) for vm, s in zip(forks, children)]
+    result = None
+    for vm, s, unit in zip(forks, children, units):
+        result, returned, exc = sched.join(unit)
+        if exc is not None:
+            raise exc
+        self.join_fork(vm, s)
+        if returned:
+            break
+    metrics = self.vese_metrics()
+    metrics["parallel_steal_blocks"] = metrics.get("parallel_steal_blocks", 0) + 1
+    return result
+
+def exec_task_chunk(self, var, lo, hi, block, reducer):
+    # (part, seconds, error) of one `parallel for` chunk on a fork
+    started = time.perf_counter()
+    try:
+        return self.run_for_chunk(var, lo, hi, block, reducer), time.perf_counter() - started, None
+    except Exception as exc:
+        return None, 0.0, exc
+
+def run_for_forked(self, var, bounds, block, reducer):
+    # `parallel for` chunks on forks: stolen units in steal mode, one thread each
+    # otherwise; assignments to outer names are joined back in chunk order
+    forks = [self.fork() for _ in bounds]
+    jobs = [lambda vm=vm, a=a, b=b: vm.exec_task_chunk(var, a, b, block, reducer)
+            for vm, (a, b) in zip(forks, bounds)]
+    if PARALLEL_MODE == "steal":
+        sched = get_steal_scheduler()
+        outcomes = [sched.join(unit) for unit in [sched.submit(job) for job in jobs]]
+    else:
+        tasks = [VeseTask(job) for job in jobs]
+        threads = [threading.Thread(target=task.run) for task in tasks]
+        for t in threads:
+            t.start()
+        with TASKS.joining():
+            for t in threads:
+                t.join()
+        outcomes = [task.result for task in tasks]
+    parts, busy = [], 0.0
+    for vm, (part, elapsed, exc) in zip(forks, outcomes):
+        if exc is not None:
+            raise exc
+        self.join_fork(vm, block)
+        parts.append(part)
+        busy += elapsed
+    metrics = self.vese_metrics()
+    metrics["parallel_for_forked"] = metrics.get("parallel_for_forked", 0) + 1
+    return parts, busy
+
+class VESE(VESE):
+    exec_task_block = exec_task_block
+    exec_parallel_steal = exec_parallel_steal
+    exec_task_chunk = exec_task_chunk
+    run_for_forked = run_for_forked
+
+# vese.py — bounded channels between async tasks
+
+class Channel:
+    __slots__ = ("capacity", "buf", "closed", "cond", "sent", "received", "blocked_sends", "blocked_recvs")
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("Channel capacity must be at least 1")
+        self.capacity = capacity
+        self.buf = deque()
+        self.closed = False
+        self.cond = threading.Condition()   # per channel: only producers/consumers of it contend
+        self.sent = 0
+        self.received = 0
+        self.blocked_sends = 0
+        self.blocked_recvs = 0
+
+    def try_send(self, value):
+        with self.cond:
+            if self.closed:
+                raise RuntimeError("send on closed channel")
+            if len(self.buf) >= self.capacity:
+                return False
+            self.buf.append(value)
+            self.sent += 1
+            TASKS.moved()   # before the notify: a waiter rechecks progress under this lock
+            self.cond.notify_all()
+        return True
+
+    def try_recv(self, n):
+        # list of up to n items, [] once closed and drained, None if the caller must wait
+        with self.cond:
+            if self.buf:
+                items = [self.buf.popleft() for _ in range(min(n, len(self.buf)))]
+                self.received += len(items)
+                TASKS.moved()
+                self.cond.notify_all()
+            else:
+                return [] if self.closed else None
+        return items
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            TASKS.moved()
+            self.cond.notify_all()
+
+from contextlib import contextmanager
+
+CHANNEL_OPS = ("send", "recv", "recv_batch")
+CHANNEL_BUILTINS = CHANNEL_OPS + ("channel", "close")
+CALL_TAGS = (DGM_MAP["EFFECT_INVOKE"], DGM_MAP["FUNC_CALL"])   # `send(ch, v)` parses as a plain call
+
+def node_cache(node):
+    # per-node facts the runtime derives once, keyed by purpose; they live on the
+    # node's own `cache` slot, so they go away with the tree and never alias by id()
+    cache = getattr(node, "cache", None)
+    if cache is None:
+        cache = node.cache = {}
+    return cache
+
+class TaskSlot:
+    # one thread's share of the counts; only its own thread writes it
+    __slots__ = ("thread", "queued", "started", "progress", "parked", "depth")
+
+    def __init__(self, thread):
+        self.thread = thread
+        self.queued = 0     # tasks this thread created
+        self.started = 0    # tasks this thread began running
+        self.progress = 0   # transfers, queued and finished tasks seen from this thread
+        self.parked = 0
+        self.depth = 0      # nested units running on this thread
+
+class TaskCounts:
+    # OS threads running VESE tasks vs. how many of them are parked waiting; a wait
+    # is a deadlock once every such thread is parked and a whole tick passes without
+    # progress (a channel transfer, a task queued or finished). Submitting, running
+    # and transferring only bump the caller's own slot: the slots are summed only by
+    # a thread that is about to wait, so the hot path never takes a shared lock
+    def __init__(self):
+        self.local = threading.local()
+        self.slots = []
+        self.retired = TaskSlot(None)   # totals of threads that have exited
+        self.register = threading.Lock()   # once per thread, on its first count
+
+    def slot(self):
+        slot = getattr(self.local, "slot", None)
+        if slot is None:
+            slot = self.local.slot = TaskSlot(threading.current_thread())
+            with self.register:
+                live = []
+                for s in self.slots:
+                    if s.thread.is_alive():
+                        live.append(s)
+                    else:   # its counts are final: fold them in
+                        self.retired.queued += s.queued
+                        self.retired.started += s.started
+                        self.retired.progress += s.progress
+                live.append(slot)
+                self.slots = live   # readers iterate whichever list they loaded
+        return slot
+
+    def total(self, field):
+        return getattr(self.retired, field) + sum(getattr(s, field) for s in self.slots)
+
+    @property
+    def progress(self):
+        return self.total("progress")
+
+    def queue(self):
+        slot = self.slot()
+        slot.queued += 1
+        slot.progress += 1
+
+    @contextmanager
+    def run(self):
+        slot = self.slot()
+        slot.started += 1
+        slot.depth += 1
+        try:
+            yield
+        finally:
+            slot.depth -= 1
+            slot.progress += 1
+
+    def moved(self):
+        self.slot().progress += 1
+
+    def running_threads(self):
+        # the program's own thread, plus each other thread inside a task
+        main = threading.main_thread()
+        return 1 + sum(1 for s in self.slots if s.depth and s.thread is not main)
+
+    def park(self, seen, cond, timeout=0.01):
+        # one tick of waiting for progress past `seen`, on the condition of what we wait for
+        slot = self.slot()
+        slot.parked += 1
+        try:
+            with cond:
+                if self.progress != seen:
+                    return
+                cond.wait(timeout)
+            if self.progress == seen:
+                queued = self.total("queued") - self.total("started")   # created, not started yet
+                if self.total("parked") >= self.running_threads() + queued:
+                    raise RuntimeError("Deadlock: channel operation can never complete")
+        finally:
+            slot.parked -= 1
+
+    @contextmanager
+    def joining(self):
+        # a thread blocked in join() is parked too, or its children could never deadlock
+        slot = self.slot()
+        slot.parked += 1
+        try:
+            yield
+        finally:
+            slot.parked -= 1
+
+TASKS = TaskCounts()
+
+def channel_ops(stmt):
+    # channel invocations a simple statement performs itself (nested async bodies excluded)
+    ops, stack = [], [stmt]
+    while stack:
+        n = stack.pop()
+        if not isinstance(n, ASTNode) or n.tag == DGM_MAP["ASYNC_BLOCK"]:
+            continue
+        if n.tag in CALL_TAGS and n.value in CHANNEL_OPS:
+            ops.append(n)
+        stack.extend(n.children)
+    return ops
+
+def blocked_on(self, stmt):
+    """Channel that `stmt` would block on right now, so its fiber can yield first."""
+    if stmt.tag in (DGM_MAP["FOR"], DGM_MAP["WHILE"], DGM_MAP["IF"]):
+        return None
+    cache = node_cache(stmt)
+    ops = cache.get("channel_ops")
+    if ops is None:
+        ops = cache["channel_ops"] = channel_ops(stmt)
+    # statements with several channel ops fall back to a nested wait_until
+    if len(ops) != 1 or ops[0].children[0].tag != DGM_MAP["VAR"]:
+        return None
+    op = ops[0]
+    try:
+        ch = self.get_var(op.children[0].value)
+    except NameError:
+        return None
+    if not isinstance(ch, Channel) or ch.closed:
+        return None
+    if op.value == "send":
+        return ch if len(ch.buf) >= ch.capacity else None
+    return None if ch.buf else ch
+
+def wait_until(self, ready, ch):
+    # suspend the current task: run other fibers / stolen units until `ready()` holds
+    sched = self.fibers()
+    stealer = get_steal_scheduler() if PARALLEL_MODE == "steal" else None
+    worker = stealer.current() if stealer is not None else None
+    while True:
+        seen = TASKS.progress   # read before ready(), so a transfer in between is not missed
+        if ready():
+            return
+        if sched.run_queue:
+            sched.check_stall()
+            sched.step(sched.run_queue.popleft())
+            continue
+        # a unit run here sits on top of the blocked task until it finishes, so if it waits
+        # on this task it never can: leave queued units to idle workers while there are any
+        unit = stealer.find_work(worker) if worker is not None and not stealer.sleeping else None
+        if unit is not None:
+            stealer.execute(worker, unit)
+        else:
+            TASKS.park(seen, ch.cond)
+
+def channel_send(self, ch, value):
+    if not ch.try_send(value):
+        ch.blocked_sends += 1
+        self.wait_until(lambda: ch.try_send(value), ch)
+
+def channel_recv(self, ch, n):
+    items = ch.try_recv(n)
+    if items is None:
+        ch.blocked_recvs += 1
+        box = []
+        def ready():
+            got = ch.try_recv(n)
+            if got is None:
+                return False
+            box.append(got)
+            return True
+        self.wait_until(ready, ch)
+        items = box[0]
+    return items
+
+class VESE(VESE):
+    blocked_on = blocked_on
+    wait_until = wait_until
+    channel_send = channel_send
+    channel_recv = channel_recv
+
+    def is_channel_op(self, stmt):
+        # a builtin unless the program defines a flow of the same name
+        return (stmt.tag in CALL_TAGS and stmt.value in CHANNEL_BUILTINS
+                and (stmt.tag == DGM_MAP["EFFECT_INVOKE"] or stmt.value not in self.functions))
+
+    def exec_stmt(self, stmt):
+        if not self.is_channel_op(stmt):
+            return super().exec_stmt(stmt)
+        op = stmt.value
+        if op == "channel":
+            return Channel(self.eval_expr(stmt.children[0]) if stmt.children else 1)
+        elif op == "send":
+            self.channel_send(self.eval_expr(stmt.children[0]), self.eval_expr(stmt.children[1]))
+        elif op == "recv":
+            items = self.channel_recv(self.eval_expr(stmt.children[0]), 1)
+            if not items:
+                raise RuntimeError("recv on closed channel")
+            return items[0]
+        elif op == "recv_batch":
+            ch = self.eval_expr(stmt.children[0])
+            return self.channel_recv(ch, self.eval_expr(stmt.children[1]))
+        else:
+            self.eval_expr(stmt.children[0]).close()
+
+# vese.py — handler stack with O(1) lookup and one-shot continuations
+
+class HandlerFrame:
+    __slots__ = ("effect", "cases", "parent", "depth")
+
+    def __init__(self, effect, cases, parent):
+        self.effect = effect
+        self.cases = cases        # {opname: HANDLER_CASE node}
+        self.parent = parent      # linked stack: entering a handler never copies
+        self.depth = parent.depth + 1 if parent is not None else 0
+
+class Continuation:
+    # one-shot: resumes the suspended `handle ... run` generator exactly once
+    __slots__ = ("vm", "frame", "op", "gen", "scopes", "used")
+
+    def __init__(self, vm, frame, op, gen):
+        self.vm = vm
+        self.frame = frame
+        self.op = op
+        self.gen = gen
+        self.scopes = vm.scope_stack   # frames of the suspended computation
+        self.used = False
+
+    def __call__(self, value=None):
+        if self.used:
+            raise RuntimeError(f"Continuation of {self.op} resumed twice")
+        self.used = True
+        vm = self.vm
+        stack = vm.op_handlers[self.op]
+        stack.append(self.frame)   # the resumed computation sees this handler again
+        saved = vm.scope_stack
+        vm.scope_stack = self.scopes
+        try:
+            return vm.drive(self.frame, self.gen, value)
+        finally:
+            vm.scope_stack = saved
+            stack.pop()
+
+def push_handler(self, effect, cases):
+    if not hasattr(self, "op_handlers"):
+        self.op_handlers = {}   # {opname: [frames]}: top of each list is the active handler
+        self.handler_top = None
+    frame = HandlerFrame(effect, {c.value[0]: c for c in cases}, self.handler_top)
+    self.handler_top = frame
+    for op in frame.cases:
+        self.op_handlers.setdefault(op, []).append(frame)
+    return frame
+
+def pop_handler(self, frame):
+    for op in frame.cases:
+        self.op_handlers[op].pop()
+    self.handler_top = frame.parent
+
+def handles(self, op):
+    return bool(getattr(self, "op_handlers", {}).get(op))
+
+def case_info(self, case):
+    # cached per HANDLER_CASE: (params, body, whether the body captures `resume`)
+    cache = node_cache(case)
+    info = cache.get("case_info")
+    if info is None:
+        _, params = case.value
+        resumes = any(n.value == "resume" for body in case.children for n in iter_ast(body)
+                      if n.tag in (DGM_MAP["VAR"], DGM_MAP["FUNC_CALL"]))
+        info = cache["case_info"] = (params, case.children, resumes)
+    return info
+
+def run_case(self, frame, op, args, k):
+    params, body, _ = self.case_info(frame.cases[op])
+    stack = self.op_handlers[op]
+    stack.pop()   # the case body runs under the outer handlers
+    saved = (self.scope_stack, self.return_flag, self.return_value)
+    self.scope_stack = self.scope_stack + [{}]   # own list: a resumed computation keeps its frames
+    self.return_flag, self.return_value = False, None
+    try:
+        for p, a in zip(params, args):
+            self.set_var(p, a)
+        if k is not None:
+            self.set_var("resume", k)
+        result = None
+        for s in body:
+            result = self.exec_stmt(s)
+            if self.return_flag:
+                result = self.return_value
+                break
+        return result
+    finally:
+        self.scope_stack, self.return_flag, self.return_value = saved
+        stack.append(frame)
+
+def perform(self, op, args):
+    # performs nested inside expressions resume implicitly with the case's value
+    stack = getattr(self, "op_handlers", {}).get(op)
+    if not stack:
+        raise Exception(f"Unhandled effect operation {op}")
+    return self.perform_at(stack[-1], op, args)
+
+def perform_at(self, frame, op, args):
+    _, _, resumes = self.case_info(frame.cases[op])
+    if resumes:
+        box = []
+        k = lambda value=None: box.append(value) or value
+        result = self.run_case(frame, op, args, k)
+        return box[0] if box else result
+    return self.run_case(frame, op, args, None)
+
+def direct_perform(self, frame, stmt):
+    # (invocation node, binding kind) when `stmt` itself performs one of frame's ops
+    node, bind = stmt, None
+    if stmt.tag == DGM_MAP["VAR"] and isinstance(stmt.value, tuple):
+        node, bind = stmt.children[0], "let"
+    elif stmt.tag == DGM_MAP["RETURN"]:
+        node, bind = stmt.children[0], "return"
+    if node.tag in (DGM_MAP["EFFECT_INVOKE"], DGM_MAP["FUNC_CALL"]) and node.value in frame.cases:
+        return node.value, node.children, bind
+    if node.tag == DGM_MAP["FLOW"] and node.value in frame.cases:   # print(...) lexes as a keyword
+        return node.value, node.children, bind
+    return None, None, None
+
+def handled_stmts(self, frame, stmts):
+    result = None
+    for s in stmts:
+        if s.tag == DGM_MAP["EFFECT_BLOCK"]:
+            result = yield from self.handled_stmts(frame, s.children)
+        else:
+            op, arg_nodes, bind = self.direct_perform(frame, s)
+            if op is None:
+                result = self.exec_stmt(s)
+            else:
+                result = yield (op, [self.eval_expr(a) for a in arg_nodes])
+                if bind == "let":
+                    self.set_var(s.value[0], result)
+                elif bind == "return":
+                    self.return_flag, self.return_value = True, result
+        if self.return_flag:
+            self.return_flag = False
+            return self.return_value
+    return result
+
+def drive(self, frame, gen, value):
+    while True:
+        try:
+            op, args = gen.send(value)
+        except StopIteration as stop:
+            return stop.value
+        if self.case_info(frame.cases[op])[2]:
+            # the case decides: resume(v) continues the computation, returning aborts it
+            k = Continuation(self, frame, op, gen)
+            result = self.run_case(frame, op, args, k)
+            if not k.used:
+                gen.close()
+            return result
+        value = self.run_case(frame, op, args, None)   # tail-resumptive: loop, no new frames
+
+class VESE(VESE):
+    push_handler = push_handler
+    pop_handler = pop_handler
+    handles = handles
+    case_info = case_info
+    run_case = run_case
+    perform = perform
+    perform_at = perform_at
+    direct_perform = direct_perform
+    handled_stmts = handled_stmts
+    drive = drive
+
+    def exec_stmt(self, stmt):
+        if stmt.tag == DGM_MAP["HANDLER_DEF"]:
+            cases = [c for c in stmt.children if c.tag == DGM_MAP["HANDLER_CASE"]]
+            body = [c for c in stmt.children if c.tag != DGM_MAP["HANDLER_CASE"]]
+            frame = self.push_handler(stmt.value, cases)
+            try:
+                return self.drive(frame, self.handled_stmts(frame, body), None)
+            finally:
+                self.pop_handler(frame)
+        elif stmt.tag in (DGM_MAP["EFFECT_INVOKE"], DGM_MAP["FUNC_CALL"]) and self.handles(stmt.value):
+            return self.perform(stmt.value, [self.eval_expr(a) for a in stmt.children])
+        return super().exec_stmt(stmt)
+
+# vese.py — statically resolved handlers (see dgm_passes.resolve_effects)
+
+def static_op(self, frame, node):
+    # node.handler: False = resolved to a builtin, a HANDLER_CASE = bound by the pass
+    case = getattr(node, "handler", None)
+    if case is False:
+        return False
+    if case is not None and frame.cases.get(case.value[0]) is case:
+        return case.value[0]
+    return None   # unannotated or escaped its lexical handler: look up by name
+
+def direct_perform(self, frame, stmt):
+    node, bind = stmt, None
+    if stmt.tag == DGM_MAP["VAR"] and isinstance(stmt.value, tuple):
+        node, bind = stmt.children[0], "let"
+    elif stmt.tag == DGM_MAP["RETURN"]:
+        node, bind = stmt.children[0], "return"
+    op = self.static_op(frame, node)
+    if op:
+        return op, node.children, bind
+    if op is None and node.tag in (DGM_MAP["EFFECT_INVOKE"], DGM_MAP["FUNC_CALL"], DGM_MAP["FLOW"]) \
+            and node.value in frame.cases:
+        return node.value, node.children, bind
+    return None, None, None
+
+class VESE(VESE):
+    static_op = static_op
+    direct_perform = direct_perform
+
+    def exec_stmt(self, stmt):
+        if stmt.tag in (DGM_MAP["EFFECT_INVOKE"], DGM_MAP["FUNC_CALL"]):
+            case = getattr(stmt, "handler", None)
+            if case:
+                op = case.value[0]
+                args = [self.eval_expr(a) for a in stmt.children]
+                stack = getattr(self, "op_handlers", {}).get(op)
+                if stack and stack[-1].cases.get(op) is case:
+                    return self.perform_at(stack[-1], op, args)   # the bound case, no lookup by name
+                return self.perform(op, args)
+        return super().exec_stmt(stmt)
+
+# vese.py — trampolined do/for bind chains
+
+class Bounce:
+    # returned by a tail-called continuation: the trampoline resumes `steps` at `i`
+    __slots__ = ("steps", "i", "value")
+
+    def __init__(self, steps, i, value):
+        self.steps = steps
+        self.i = i
+        self.value = value
+
+def bind_method(self, monad):
+    if isinstance(monad, dict) and "__enum__" in monad:
+        impl = self.impls.get((monad["__enum__"], "Monad"), None)
+        if impl:
+            for stmt in impl:
+                if stmt.value[1] == "bind":
+                    return stmt
+    return None
+
+def bind_is_tail(self, method):
+    # True when the bind only ever does `return f(...)`: its continuation can bounce
+    cache = node_cache(method)
+    tail = cache.get("bind_tail")
+    if tail is None:
+        params, block = method.children
+        f = params.value[0] if params.value else None
+        tail_calls, uses = 0, 0
+        for n in iter_ast(block):
+            if n.tag == DGM_MAP["RETURN"] and n.children and n.children[0].tag == DGM_MAP["FUNC_CALL"] \
+                    and n.children[0].value == f:
+                tail_calls += 1
+            if n.tag in (DGM_MAP["VAR"], DGM_MAP["FUNC_CALL"]) and n.value == f:
+                uses += 1
+        tail = cache["bind_tail"] = f is not None and uses == tail_calls
+    return tail
+
+def pure_method(self, monad, node=None):
+    if isinstance(monad, dict) and "__enum__" in monad:
+        impl = self.impls.get((monad["__enum__"], "Monad"), None)
+        if impl:
+            for stmt in impl:
+                if stmt.value[1] == "pure":
+                    return stmt
+    return None
+
+def run_chain(self, steps, i=0, value=None, frame=None, monad=None):
+    if frame is None:
+        frame = self.scope_stack[-1]   # binds land in the block's scope, not the bind method's
+    while True:
+        step = steps[i]
+        if step.tag != DGM_MAP["MONAD_BIND"]:
+            value = self.eval_expr(step.children[0]) if step.children else value
+            # `return x` / `yield x` ends the chain in the bound monad: its impl's pure(x)
+            method = self.pure_method(monad, step) if monad is not None else None
+            return self.exec_method(monad, method, [value]) if method is not None else value
+        monad = self.eval_expr(step.children[0])
+        if isinstance(monad, FastMonad):
+            # lazy: the rest of the chain runs when the computation itself is run
+            return FastMonad(self, monad.monad, "bind", monad, self.chain_cont(steps, i + 1, step.value, frame))
+        method = self.bind_method(monad, step)
+        if method is None:
+            return monad
+        if self.bind_is_tail(method):
+            def cont(x, var=step.value, nxt=i + 1):
+                frame[var] = x
+                return Bounce(steps, nxt, x)
+        else:
+            def cont(x, var=step.value, nxt=i + 1, monad=monad):
+                frame[var] = x
+                return self.run_chain(steps, nxt, x, frame, monad)
+        result = self.exec_method(monad, method, [cont])
+        if not isinstance(result, Bounce):
+            return result
+        steps, i, value = result.steps, result.i, result.value
+
+def monad_bind(self, monad, cont):
+    method = self.bind_method(monad)
+    if method is not None:
+        return self.exec_method(monad, method, [cont])
+    return monad
+
+class VESE(VESE):
+    bind_method = bind_method
+    pure_method = pure_method
+    bind_is_tail = bind_is_tail
+    run_chain = run_chain
+    monad_bind = monad_bind
+
+    def exec_stmt(self, stmt):
+        if stmt.tag in (DGM_MAP["DO_BLOCK"], DGM_MAP["FOR_BLOCK"]):
+            return self.run_chain(stmt.children)
+        return super().exec_stmt(stmt)
+
+    def eval_expr(self, node):
+        # `let m = do { ... }`: the chain's result is the expression's value
+        if node.tag in (DGM_MAP["DO_BLOCK"], DGM_MAP["FOR_BLOCK"]):
+            return self.run_chain(node.children)
+        return super().eval_expr(node)
+
+# vese.py — defunctionalized State, Reader and Writer
+
+FAST_MONADS = ("State", "Reader", "Writer", "tell")
+
+class FastMonad(dict):
+    # a State/Reader/Writer computation as data instead of a {"run": closure} dict.
+    # kinds: pure(value) | lift(fn) | writer((value, log)) | tell(entry) | bind(m, k)
+    __slots__ = ("vm", "monad", "kind", "arg", "k")
+
+    def __init__(self, vm, monad, kind, arg, k=None):
+        super().__init__()
+        self.vm = vm
+        self.monad = monad
+        self.kind = kind
+        self.arg = arg
+        self.k = k
+
+    def __missing__(self, key):
+        # the old closure-dict interface: m["run"](s), w["value"], w["log"]
+        if key == "run":
+            return lambda arg=None: self.vm.run_monad(self, arg)
+        if self.monad == "Writer" and key in ("value", "log"):
+            value, log = self.vm.run_monad(self, None)
+            self["value"], self["log"] = value, self.vm.to_list(log)
+            return self[key]
+        raise KeyError(key)
+
+def apply_value(self, fn, *args):
+    if callable(fn):
+        return fn(*args)
+    params, block = fn   # a flow value: (params node, body block)
+    self.push_scope()
+    try:
+        for p, a in zip(params.value, args):
+            self.set_var(p, a)
+        for s in block.children:
+            self.exec_stmt(s)
+            if self.return_flag:
+                self.return_flag = False
+                return self.return_value
+    finally:
+        self.pop_scope()
+
+def from_list(self, lst):
+    if isinstance(lst, (list, tuple)):
+        return list(lst)
+    items = []
+    while isinstance(lst, dict) and lst.get("__variant__") == "Cons":
+        h, lst = lst["fields"]
+        items.append(h)
+    return items
+
+def to_list(self, items):
+    lst = self.construct_variant("List", "Nil", [])
+    for h in reversed(items):
+        lst = self.construct_variant("List", "Cons", [h, lst])
+    return lst
+
+def as_monad(self, monad, value):
+    if isinstance(value, FastMonad):
+        return value
+    # computations still built the old way: {"run": s -> (a, s) / r -> a}, {"value", "log"}
+    if isinstance(value, dict) and "__enum__" not in value:
+        if callable(value.get("run")):
+            return FastMonad(self, monad, "lift", value["run"])
+        if monad == "Writer" and "value" in value and "log" in value:
+            return FastMonad(self, monad, "writer", (value["value"], value["log"]))
+    return FastMonad(self, monad, "pure", value)
+
+def chain_cont(self, steps, nxt, var, frame):
+    def k(x):
+        frame[var] = x
+        return self.run_chain(steps, nxt, x, frame)
+    return k
+
+def run_monad(self, m, arg):
+    # the state is one mutable slot, the reader env a plain value, the log an append buffer;
+    # pending continuations live on a list, so long bind chains never grow the Python stack
+    monad = m.monad
+    state, env, log = arg, arg, []
+    stack = []
+    while True:
+        kind = m.kind
+        if kind == "bind":
+            stack.append(m.k)
+            m = m.arg
+            continue
+        if kind == "pure":
+            value = m.arg
+        elif kind == "tell":
+            log.append(m.arg)
+            value = None
+        elif kind == "writer":
+            value, entries = m.arg
+            log.extend(self.from_list(entries))
+        elif monad == "State":
+            value, state = self.apply_value(m.arg, state)   # s -> (a, s)
+        else:
+            value = self.apply_value(m.arg, env)            # r -> a
+        if not stack:
+            break
+        m = self.as_monad(monad, stack.pop()(value))
+    if monad == "State":
+        return (value, state)
+    if monad == "Writer":
+        return (value, log)
+    return value
+
+def run_state(self, state, init):
+    if isinstance(state, FastMonad):
+        return self.run_monad(state, init)
+    return state["run"](init)
+
+def run_reader(self, reader, env):
+    if isinstance(reader, FastMonad):
+        return self.run_monad(reader, env)
+    return reader["run"](env)
+
+def run_writer(self, writer):
+    if isinstance(writer, FastMonad):
+        value, log = self.run_monad(writer, None)
+        return (value, self.to_list(log))
+    return (writer["value"], writer["log"])
+
+class VESE(VESE):
+    apply_value = apply_value
+    from_list = from_list
+    to_list = to_list
+    as_monad = as_monad
+    chain_cont = chain_cont
+    run_monad = run_monad
+    run_state = run_state
+    run_reader = run_reader
+    run_writer = run_writer
+
+    def eval_binop(self, op, left, right):
+        if op == ">>=" and isinstance(left, FastMonad):
+            return FastMonad(self, left.monad, "bind", left, lambda x: self.apply_value(right, x))
+        return super().eval_binop(op, left, right)
+
+    def eval_expr(self, node):
+        if node.tag == DGM_MAP["FUNC_CALL"] and node.value in FAST_MONADS \
+                and node.value not in getattr(self, "functions", {}):
+            args = [self.eval_expr(a) for a in node.children]
+            if node.value == "tell":
+                return FastMonad(self, "Writer", "tell", args[0])
+            if node.value == "Writer":
+                return FastMonad(self, "Writer", "writer", (args[0], args[1] if len(args) > 1 else []))
+            return FastMonad(self, node.value, "lift", args[0])
+        return super().eval_expr(node)
+
+    def exec_stmt(self, stmt):
+        if stmt.tag == DGM_MAP["METHOD_CALL"]:
+            base, mname = stmt.value
+            obj = self.get_var(base) if isinstance(base, str) else None
+            if isinstance(obj, FastMonad) and mname == "run":
+                return self.run_monad(obj, self.eval_expr(stmt.children[0]) if stmt.children else None)
+        return super().exec_stmt(stmt)
+
+# vese.py — per-type method tables and inline caches
+
+_vtable_epoch = 0   # bumped by register_impl in any VM: every inline cache filled before misses
+
+def register_impl(self, sname, tname, methods, type_args=None):
+    # impl bodies compile to {method: METHOD_DEF} tables once, at registration
+    global _vtable_epoch
+    if not hasattr(self, "vtables"):
+        self.vtables = {}        # {type: {method: METHOD_DEF}} across all traits
+        self.trait_tables = {}   # {(type, trait): {method: METHOD_DEF}}
+    table = {m.value[1]: m for m in methods}
+    if type_args is None:
+        self.impls[(sname, tname)] = methods
+        key = sname
+    else:
+        type_args = tuple(type_args)
+        self.generic_impls[(sname, tname, type_args)] = methods
+        # one entry per instantiation, so Box<int> and Box<str> never overwrite each other
+        key = (sname, type_args)
+    self.trait_tables[(key, tname)] = table
+    # rebuilt, not updated in place: a fork's tables read through to its parent's entries
+    self.vtables[key] = {**self.vtables.get(key, {}), **table}
+    if type_args is not None:
+        # a generic impl also serves values whose instance is unknown
+        if (sname, tname) not in self.trait_tables:
+            self.trait_tables[(sname, tname)] = table
+        self.vtables[sname] = {**table, **self.vtables.get(sname, {})}
+    _vtable_epoch += 1
+
+def type_key(value):
+    if isinstance(value, dict):
+        return value.get("__enum__") or value.get("__type__")
+    return type(value).__name__
+
+def lookup_method(self, node, key, mname, trait=None, type_args=None):
+    # inline cache on the call site: (epoch, table, type, method). The epoch is global and
+    # the table is compared by identity, so a cache filled by one VM never answers another
+    tables = getattr(self, "vtables" if trait is None else "trait_tables", {})
+    ckey = (key, type_args, trait)
+    cache = node_cache(node).get("method") if node is not None else None
+    if cache is not None and cache[0] == _vtable_epoch and cache[1] is tables and cache[2] == ckey:
+        return cache[3]
+    method = None
+    for k in ((key, type_args), key) if type_args else (key,):
+        found = tables.get(k if trait is None else (k, trait), {}).get(mname)
+        if found is not None:
+            method = found
+            break
+    if node is not None:
+        node_cache(node)["method"] = (_vtable_epoch, tables, ckey, method)
+    return method
+
+def exec_method(self, obj, method, args):
+    params, block = method.children
+    self.push_scope()
+    saved = (self.return_flag, self.return_value)
+    self.return_flag, self.return_value = False, None
+    try:
+        self.set_var("self", obj)
+        for p, a in zip(params.value, args):
+            self.set_var(p, a)
+        result = None
+        for s in block.children:
+            result = self.exec_stmt(s)
+            if self.return_flag:
+                result = self.return_value
+                break
+        return result
+    finally:
+        self.return_flag, self.return_value = saved
+        self.pop_scope()
+
+def bind_method(self, monad, node=None):
+    if isinstance(monad, dict) and "__enum__" in monad:
+        return self.lookup_method(node, monad["__enum__"], "bind", "Monad")
+    return None
+
+def pure_method(self, monad, node=None):
+    if isinstance(monad, dict) and "__enum__" in monad:
+        return self.lookup_method(node, monad["__enum__"], "pure", "Monad")
+    return None
+
+def monad_bind(self, monad, cont):
+    method = self.bind_method(monad)
+    if method is not None:
+        return self.exec_method(monad, method, [cont])
+    return monad
+
+class VESE(VESE):
+    register_impl = register_impl
+    lookup_method = lookup_method
+    exec_method = exec_method
+    bind_method = bind_method
+    pure_method = pure_method
+    monad_bind = monad_bind
+
+    def eval_binop(self, op, left, right):
+        if op == ">>=" and isinstance(left, dict) and "__enum__" in left:
+            method = self.bind_method(left)
+            if method is None:
+                raise Exception("No monad bind impl")
+            return self.exec_method(left, method, [right])
+        return super().eval_binop(op, left, right)
+
+    def exec_stmt(self, stmt):
+        if stmt.tag == DGM_MAP["TRAIT_IMPL"]:
+            sname, tname = stmt.value
+            if tname in self.traits and isinstance(self.traits[tname], dict):
+                required = list(self.traits[tname]["methods"])
+                parent = self.traits[tname]["parent"]
+                while parent:
+                    required += self.traits[parent]["methods"]
+                    parent = self.traits[parent]["parent"]
+                names = {m.value[1] for m in stmt.children}
+                for r in required:
+                    if r not in names:
+                        raise Exception(f"{sname} missing trait method {r} from {tname}")
+            self.register_impl(sname, tname, stmt.children)
+
+        elif stmt.tag == DGM_MAP["GENERIC_IMPL"]:
+            sname, tname, type_args = stmt.value
+            self.register_impl(sname, tname, stmt.children, type_args)
+
+        elif stmt.tag == DGM_MAP["METHOD_CALL"]:
+            base, mname = stmt.value
+            obj = self.get_var(base) if isinstance(base, str) else None
+            method = self.lookup_method(stmt, type_key(obj), mname) if obj is not None else None
+            if method is not None:
+                return self.exec_method(obj, method, [self.eval_expr(a) for a in stmt.children])
+            return super().exec_stmt(stmt)
+        else:
+            return super().exec_stmt(stmt)
+
+# vese.py — hash-consed variants
+
+import sys, weakref
+
+HASH_CONS = False   # per program: vm.hash_cons = True
+
+def variant_parts(v):
+    # (enum, variant, fields as a tuple): plain variants hold a list, interned ones a tuple
+    fields = v.get("fields", ())
+    return v.get("__enum__"), v.get("__variant__"), tuple(fields) if isinstance(fields, list) else fields
+
+def frozen(self, *args, **kwargs):
+    raise TypeError("Variant is immutable")
+
+class Variant(dict):
+    # an interned, immutable variant: structurally equal values built by one VM are the same object
+    __slots__ = ("__weakref__", "hash")
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, dict):
+            return NotImplemented
+        if isinstance(other, Variant) and self.hash != other.hash:
+            return False   # different structure; equal hashes still compare fields
+        return variant_parts(self) == variant_parts(other)
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __hash__(self):
+        return self.hash
+
+    __setitem__ = __delitem__ = update = setdefault = pop = popitem = clear = __ior__ = frozen
+
+    def __reduce__(self):
+        # dict's default pickling refills the copy item by item, which is frozen
+        return make_variant, variant_parts(self)
+
+def make_variant(ename, vname, fields):
+    v = Variant(__enum__=ename, __variant__=vname, fields=fields)
+    v.hash = hash((ename, vname, fields))   # fields are scalars or Variants: hashable
+    return v
+
+def cons_key(ename, vname, values):
+    # fields are already interned, so identity stands in for structure; None if unhashable
+    key = [ename, vname]
+    for v in values:
+        if isinstance(v, Variant):
+            key.append((id(v),))
+        elif isinstance(v, (int, float, str, bool, type(None))):
+            key.append((type(v), v))   # keeps 1, 1.0 and True apart
+        else:
+            return None
+    return tuple(key)
+
+def construct_variant(self, ename, vname, values):
+    if not getattr(self, "hash_cons", HASH_CONS):
+        return {"__enum__": ename, "__variant__": vname, "fields": values}
+    if not hasattr(self, "cons_table"):
+        self.cons_table = weakref.WeakValueDictionary()
+        self.cons_stats = {"constructed": 0, "shared": 0, "unshareable": 0, "bytes_saved": 0}
+    stats = self.cons_stats
+    stats["constructed"] += 1
+    key = cons_key(ename, vname, values)
+    if key is None:
+        stats["unshareable"] += 1
+        return {"__enum__": ename, "__variant__": vname, "fields": values}
+    v = self.cons_table.get(key)
+    if v is not None:
+        stats["shared"] += 1
+        stats["bytes_saved"] += sys.getsizeof(v) + sys.getsizeof(v["fields"])
+        return v
+    v = make_variant(ename, vname, tuple(values))
+    self.cons_table[key] = v
+    return v
+
+def hash_cons_stats(self):
+    stats = dict(getattr(self, "cons_stats", {"constructed": 0, "shared": 0, "unshareable": 0, "bytes_saved": 0}))
+    stats["live"] = len(getattr(self, "cons_table", ()))
+    stats["sharing_ratio"] = stats["shared"] / stats["constructed"] if stats["constructed"] else 0.0
+    self.vese_metrics()["hash_cons"] = stats
+    return stats
+
+class VESE(VESE):
+    construct_variant = construct_variant
+    hash_cons_stats = hash_cons_stats
+
+# vese.py — persistent collections
+
+from persistent import PVector, PMap, assoc_in
+
+PERSISTENT_COLLECTIONS = False   # per program: vm.persistent = True
+
+class VESE(VESE):
+    def eval_expr(self, expr):
+        if expr.tag in (DGM_MAP["LIST"], DGM_MAP["ARRAY"]) and getattr(self, "persistent", PERSISTENT_COLLECTIONS):
+            return PVector.from_iter(self.eval_expr(e) for e in expr.children)
+        return super().eval_expr(expr)
+
+    def exec_stmt(self, stmt):
+        if stmt.tag == DGM_MAP["ASSIGN"] and len(stmt.children) == 2:
+            # name[i] = v: children[0] is the index value. name[i][j] = v parses to an ITEM
+            # "path" node instead, so an index that is itself INDEX (a[b[0]]) stays a value
+            target, index = stmt.value, stmt.children[0]
+            container = self.get_var(target)
+            if isinstance(container, (PVector, PMap)):
+                path = index.tag == DGM_MAP["ITEM"] and index.value == "path"
+                indices = [self.eval_expr(n) for n in index.children] if path else [self.eval_expr(index)]
+                # path copy: O(log n), and the old version stays valid for whoever shares it
+                updated = assoc_in(container, indices, self.eval_expr(stmt.children[1]))
+                self.assign_var(target, updated)
+                return updated
+        return super().exec_stmt(stmt)   # plain lists and arrays update in place